@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from xtream import StreamTable, VodStream
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Compares the retained memory of a decoded get_vod_streams listing held as plain dicts, as VodStream
+# records and as a StreamTable. Run with `python -m benchmarks.bench_models --count 100000`.
+
+
+def synthetic_vod_listing(count: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "num": i + 1,
+                "name": f"Movie Title {i} (20{i % 25:02d})",
+                "stream_type": "movie",
+                "stream_id": 10_000 + i,
+                "stream_icon": f"http://img.example/{i}.jpg",
+                "rating": str(i % 10),
+                "rating_5based": (i % 10) / 2,
+                "added": str(1_500_000_000 + i * 60),
+                "category_id": str(i % 300),
+                "container_extension": ("mp4", "mkv", "avi")[i % 3],
+                "custom_sid": None,
+                "direct_source": "",
+            }
+            for i in range(count)
+        ]
+    ).encode()
+
+
+def retained(build: Callable[[], Any]) -> tuple[int, Any]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    payload = synthetic_vod_listing(args.count)
+
+    dict_bytes, _rows = retained(lambda: json.loads(payload))
+    record_bytes, records = retained(lambda: [VodStream.from_dict(d) for d in json.loads(payload)])
+    table_bytes, _table = retained(lambda: StreamTable.from_records(VodStream.from_dict(d) for d in json.loads(payload)))
+
+    print(f"{args.count} VOD entries")
+    for label, size in (("dict", dict_bytes), ("VodStream", record_bytes), ("StreamTable", table_bytes)):
+        print(f"{label:<12s} {size / 2**20:8.1f} MiB {size / args.count:8.0f} B/entry {size / dict_bytes:6.1%}")
+    assert len(records) == args.count
+
+
+if __name__ == "__main__":
+    main()
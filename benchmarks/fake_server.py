@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, ClassVar, Final, Self
+from urllib.parse import parse_qs, urlsplit
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from types import TracebackType
+
+# A local stand-in for an Xtream Codes panel (player_api.php and xmltv.php) serving synthetic, deterministic
+# catalogs of any size. Listings and the guide are generated while they are written, so a 500k-stream listing or
+# a multi-hundred-MB guide costs the server almost no memory.
+
+FLUSH_BYTES: Final[int] = 1 << 16
+EPOCH: Final[int] = 1_700_000_000
+POLL_INTERVAL: Final[float] = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class FakePanelConfig:
+    live_streams: int = 1_000
+    vod_streams: int = 10_000
+    series: int = 2_000
+    categories: int = 50
+    seasons_per_series: int = 3
+    episodes_per_season: int = 10
+    epg_channels: int = 1_000
+    programmes_per_channel: int = 48
+    # Added to every response before the first byte is written.
+    latency: float = 0.0
+    # Fraction of player_api.php requests answered with 503.
+    error_rate: float = 0.0
+    seed: int = 0
+    # When False, offset/items_per_page are ignored and every page is the whole listing, as on many panels.
+    paginate: bool = True
+
+
+def live_stream(i: int, categories: int) -> dict[str, Any]:
+    return {
+        "num": i,
+        "name": f"Channel {i} |EN| HD",
+        "stream_type": "live",
+        "stream_id": i,
+        "stream_icon": f"http://img.example/live/{i}.png",
+        "epg_channel_id": f"ch{i}.example",
+        "added": str(EPOCH + i),
+        "category_id": str(i % categories + 1),
+        "custom_sid": "",
+        "tv_archive": 0,
+        "direct_source": "",
+        "tv_archive_duration": 0,
+    }
+
+
+def vod_stream(i: int, categories: int, offset: int) -> dict[str, Any]:
+    return {
+        "num": i,
+        "name": f"Movie {i} ({1970 + i % 55})",
+        "stream_type": "movie",
+        "stream_id": offset + i,
+        "stream_icon": f"http://img.example/vod/{i}.jpg",
+        "rating": str(i % 10),
+        "rating_5based": (i % 10) / 2,
+        "added": str(EPOCH + i * 60),
+        "category_id": str(i % categories + 1),
+        "container_extension": ("mp4", "mkv", "avi")[i % 3],
+        "custom_sid": None,
+        "direct_source": "",
+        "tmdb": str(100_000 + i),
+    }
+
+
+def series_entry(i: int, categories: int) -> dict[str, Any]:
+    return {
+        "num": i,
+        "name": f"Series {i}",
+        "series_id": i,
+        "cover": f"http://img.example/series/{i}.jpg",
+        "plot": "A synthetic plot.",
+        "genre": ("Drama", "Comedy", "Documentary")[i % 3],
+        "releaseDate": f"{1990 + i % 35}-01-01",
+        "last_modified": str(EPOCH + i * 3600),
+        "rating_5based": (i % 10) / 2,
+        "category_id": str(i % categories + 1),
+        "tmdb": str(200_000 + i),
+    }
+
+
+class FakePanel:
+    def __init__(self, config: FakePanelConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or FakePanelConfig()
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)  # noqa: S311 - only used for fault injection
+        handler = type("Handler", (_Handler,), {"panel": self})
+        self._server = _Server((host, port), handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> Self:
+        # A short poll interval keeps stop() (and so every test using a panel) from waiting half a second.
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(POLL_INTERVAL,), name="fake-panel", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return self.config.error_rate > 0 and self._random.random() < self.config.error_rate
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    # Returns the body of a player_api.php call: either a complete JSON value or a lazily generated array.
+    def api(self, query: dict[str, str]) -> Any | Iterator[dict[str, Any]]:  # noqa: ANN401, PLR0911
+        action = query.get("action")
+        if action is None:
+            return self._auth(query)
+        if action in {"get_live_categories", "get_vod_categories", "get_series_categories"}:
+            return [{"category_id": str(i), "category_name": f"Category {i}", "parent_id": 0} for i in range(1, self.config.categories + 1)]
+        if action in {"get_live_streams", "get_vod_streams", "get_series"}:
+            return self._page(self._listing(action, query.get("category_id")), query)
+        if action == "get_vod_info":
+            return self._vod_info(int(query.get("vod_id", 0)))
+        if action == "get_series_info":
+            return self._series_info(int(query.get("series_id", 0)))
+        if action in {"get_short_epg", "get_simple_data_table"}:
+            return self._short_epg(int(query.get("stream_id", 0)), int(query.get("limit", 4)))
+        return {}
+
+    def xmltv(self) -> Iterator[str]:
+        cfg = self.config
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="fake-panel">\n'
+        for c in range(1, cfg.epg_channels + 1):
+            yield f'<channel id="ch{c}.example"><display-name>Channel {c}</display-name><icon src="http://img.example/live/{c}.png"/></channel>\n'
+        start = dt.datetime.fromtimestamp(EPOCH, tz=dt.UTC)
+        for c in range(1, cfg.epg_channels + 1):
+            for p in range(cfg.programmes_per_channel):
+                begin = (start + dt.timedelta(minutes=30 * p)).strftime("%Y%m%d%H%M%S")
+                end = (start + dt.timedelta(minutes=30 * (p + 1))).strftime("%Y%m%d%H%M%S")
+                yield (
+                    f'<programme start="{begin} +0000" stop="{end} +0000" channel="ch{c}.example">'
+                    f"<title>Show {c}-{p}</title><desc>Episode {p} of a synthetic show on channel {c}.</desc>"
+                    f"<category>Entertainment</category></programme>\n"
+                )
+        yield "</tv>\n"
+
+    def _auth(self, query: dict[str, str]) -> dict[str, Any]:
+        return {
+            "user_info": {
+                "username": query.get("username", ""),
+                "password": query.get("password", ""),
+                "message": "",
+                "auth": 1,
+                "status": "Active",
+                "exp_date": str(EPOCH + 365 * 86400),
+                "is_trial": "0",
+                "active_cons": "0",
+                "created_at": str(EPOCH),
+                "max_connections": "4",
+                "allowed_output_formats": ["m3u8", "ts"],
+            },
+            "server_info": {
+                "url": "127.0.0.1",
+                "port": "80",
+                "https_port": "443",
+                "server_protocol": "http",
+                "rtmp_port": "1935",
+                "timezone": "UTC",
+                "timestamp_now": int(time.time()),
+                "time_now": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        }
+
+    def _listing(self, action: str, category_id: str | None) -> Iterator[dict[str, Any]]:
+        cfg = self.config
+        count = {"get_live_streams": cfg.live_streams, "get_vod_streams": cfg.vod_streams, "get_series": cfg.series}[action]
+        indexes = range(1, count + 1)
+        if category_id:
+            # Item i belongs to category i % categories + 1, so the first item of category c is the smallest
+            # i >= 1 with i % categories == c - 1.
+            remainder = int(category_id) - 1
+            indexes = range(remainder or cfg.categories, count + 1, cfg.categories) if 0 <= remainder < cfg.categories else range(0)
+        if action == "get_live_streams":
+            return (live_stream(i, cfg.categories) for i in indexes)
+        if action == "get_vod_streams":
+            return (vod_stream(i, cfg.categories, cfg.live_streams) for i in indexes)
+        return (series_entry(i, cfg.categories) for i in indexes)
+
+    def _page(self, items: Iterator[dict[str, Any]], query: dict[str, str]) -> Iterator[dict[str, Any]]:
+        if "items_per_page" not in query or not self.config.paginate:
+            return items
+        offset = int(query.get("offset", 0))
+        size = int(query["items_per_page"])
+        return itertools.islice(items, offset, offset + size)
+
+    def _vod_info(self, vod_id: int) -> dict[str, Any]:
+        i = vod_id - self.config.live_streams
+        return {
+            "info": {
+                "tmdb_id": str(100_000 + i),
+                "name": f"Movie {i}",
+                "plot": "A synthetic plot.",
+                "duration_secs": 5400 + i % 1800,
+                "video": {"codec_name": ("h264", "hevc")[i % 2], "width": 1920, "height": 1080},
+                "audio": {"codec_name": ("aac", "ac3")[i % 2], "channels": 2},
+                "bitrate": 4000,
+            },
+            "movie_data": {**vod_stream(i, self.config.categories, self.config.live_streams)},
+        }
+
+    def _series_info(self, series_id: int) -> dict[str, Any]:
+        cfg = self.config
+        episodes: dict[str, list[dict[str, Any]]] = {}
+        for season in range(1, cfg.seasons_per_series + 1):
+            episodes[str(season)] = [
+                {
+                    "id": str(series_id * 10_000 + season * 100 + e),
+                    "episode_num": e,
+                    "title": f"Series {series_id} S{season:02d}E{e:02d}",
+                    "container_extension": ("mkv", "mp4")[(series_id + e) % 2],
+                    "info": {
+                        "duration_secs": 1500 + (e * 60),
+                        "video": {"codec_name": ("h264", "hevc")[series_id % 2]},
+                        "audio": {"codec_name": "aac"},
+                    },
+                    "added": str(EPOCH + series_id * 3600 + e),
+                    "season": season,
+                }
+                for e in range(1, cfg.episodes_per_season + 1)
+            ]
+        return {
+            "seasons": [{"season_number": s, "name": f"Season {s}"} for s in range(1, cfg.seasons_per_series + 1)],
+            "info": series_entry(series_id, cfg.categories),
+            "episodes": episodes,
+        }
+
+    def _short_epg(self, stream_id: int, limit: int) -> dict[str, Any]:
+        now = int(time.time()) // 1800 * 1800
+        listings = []
+        for p in range(limit):
+            start = now + p * 1800
+            listings.append(
+                {
+                    "id": str(stream_id * 1000 + p),
+                    "epg_id": str(stream_id),
+                    "title": base64.b64encode(f"Show {stream_id}-{p}".encode()).decode(),
+                    "lang": "en",
+                    "start": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start)),
+                    "end": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + 1800)),
+                    "description": base64.b64encode(b"A synthetic programme.").decode(),
+                    "channel_id": f"ch{stream_id}.example",
+                    "start_timestamp": str(start),
+                    "stop_timestamp": str(start + 1800),
+                }
+            )
+        return {"epg_listings": listings}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:  # noqa: ANN401
+        # Clients dropping idle keep-alive connections is expected and not worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle + delayed ACK add ~40ms per response.
+    disable_nagle_algorithm = True
+    panel: ClassVar[FakePanel]
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        pass
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        panel = self.panel
+        if panel.config.latency:
+            time.sleep(panel.config.latency)
+        if parts.path.endswith("/player_api.php"):
+            if panel.should_fail():
+                self._send_bytes(HTTPStatus.SERVICE_UNAVAILABLE, b"", "text/plain")
+                return
+            body = panel.api(query)
+            if isinstance(body, (dict, list)):
+                self._send_json(json.dumps(body).encode())
+            else:
+                self._send_chunked("application/json", _json_array(body))
+        elif parts.path.endswith("/xmltv.php"):
+            self._send_chunked("application/xml", panel.xmltv())
+        else:
+            self._send_bytes(HTTPStatus.NOT_FOUND, b"", "text/plain")
+
+    # Complete JSON bodies carry an ETag (a hash of the body) and are answered with 304 when it still matches.
+    def _send_json(self, body: bytes) -> None:
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'  # noqa: S324 - not used for security
+        if self.headers.get("If-None-Match") == etag:
+            self.panel.count_not_modified()
+            self._send_bytes(HTTPStatus.NOT_MODIFIED, b"", "application/json", {"ETag": etag})
+            return
+        self._send_bytes(HTTPStatus.OK, body, "application/json", {"ETag": etag})
+
+    def _send_bytes(self, status: HTTPStatus, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, content_type: str, parts: Iterable[str]) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        buf: list[bytes] = []
+        size = 0
+        for part in parts:
+            data = part.encode()
+            buf.append(data)
+            size += len(data)
+            if size >= FLUSH_BYTES:
+                self._write_chunk(b"".join(buf))
+                buf.clear()
+                size = 0
+        if buf:
+            self._write_chunk(b"".join(buf))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def _json_array(items: Iterable[dict[str, Any]]) -> Iterator[str]:
+    yield "["
+    first = True
+    for item in items:
+        if not first:
+            yield ","
+        first = False
+        yield json.dumps(item)
+    yield "]"
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Final
+
+import xtream
+from benchmarks.fake_server import FakePanel, FakePanelConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Throughput and peak RSS of the main client paths against a local FakePanel. Every scenario runs in its own
+# interpreter so its peak RSS is not polluted by the ones before it; the panel runs in the parent process.
+#
+#   python -m benchmarks.run --vod 100000 --series 5000 --latency 0.02
+#   python -m benchmarks.run --scenario epg_iter --epg-channels 5000 --programmes 200
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    scenario: str
+    items: int
+    seconds: float
+    peak_rss_mib: float
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def streams_json(x: xtream.XTream, args: argparse.Namespace) -> int:
+    return len(x.streams(x.vod_type).json())
+
+
+def streams_iter(x: xtream.XTream, args: argparse.Namespace) -> int:
+    return sum(1 for _ in x.iter_streams(x.vod_type))
+
+
+def stream_records(x: xtream.XTream, args: argparse.Namespace) -> int:
+    return len(xtream.StreamTable.from_records(x.iter_stream_records(x.vod_type)))
+
+
+def vod_info_serial(x: xtream.XTream, args: argparse.Namespace) -> int:
+    ids = [stream["stream_id"] for stream in x.streams(x.vod_type).json()[: args.info_count]]
+    for vod_id in ids:
+        x.vod_info_by_id(str(vod_id)).json()
+    return len(ids)
+
+
+def vod_info_async(x: xtream.XTream, args: argparse.Namespace) -> int:
+    ids = [str(stream["stream_id"]) for stream in x.streams(x.vod_type).json()[: args.info_count]]
+
+    async def crawl() -> int:
+        async with xtream.AsyncXTream(x.server, x.username, "bench", concurrency=args.concurrency) as ax:
+            return sum([1 async for _, r in ax.iter_vod_info(ids) if r.json()])
+
+    return asyncio.run(crawl())
+
+
+def series_info_async(x: xtream.XTream, args: argparse.Namespace) -> int:
+    ids = [str(series["series_id"]) for series in x.streams(x.series_type).json()[: args.info_count]]
+
+    async def crawl() -> int:
+        async with xtream.AsyncXTream(x.server, x.username, "bench", concurrency=args.concurrency) as ax:
+            return sum([1 async for _, r in ax.iter_series_info(ids) if r.json()["episodes"]])
+
+    return asyncio.run(crawl())
+
+
+def epg_iter(x: xtream.XTream, args: argparse.Namespace) -> int:
+    return sum(1 for _ in x.iter_epg())
+
+
+SCENARIOS: Final[dict[str, Callable[[xtream.XTream, argparse.Namespace], int]]] = {
+    "streams_json": streams_json,
+    "streams_iter": streams_iter,
+    "stream_records": stream_records,
+    "vod_info_serial": vod_info_serial,
+    "vod_info_async": vod_info_async,
+    "series_info_async": series_info_async,
+    "epg_iter": epg_iter,
+}
+
+
+def run_one(name: str, url: str, args: argparse.Namespace) -> Result:
+    with xtream.XTream(url, "bench", "bench", pool_size=args.concurrency) as x:
+        started = time.perf_counter()
+        items = SCENARIOS[name](x, args)
+        seconds = time.perf_counter() - started
+    return Result(name, items, seconds, peak_rss_mib())
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = FakePanelConfig()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default: all")
+    parser.add_argument("--live", type=int, default=defaults.live_streams)
+    parser.add_argument("--vod", type=int, default=defaults.vod_streams)
+    parser.add_argument("--series", type=int, default=defaults.series)
+    parser.add_argument("--epg-channels", type=int, default=defaults.epg_channels)
+    parser.add_argument("--programmes", type=int, default=defaults.programmes_per_channel)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API calls answered with 503")
+    parser.add_argument("--info-count", type=int, default=500, help="titles fetched by the *_info scenarios")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(asdict(run_one(args.child, args.url, args))))
+        return
+
+    config = FakePanelConfig(
+        live_streams=args.live,
+        vod_streams=args.vod,
+        series=args.series,
+        epg_channels=args.epg_channels,
+        programmes_per_channel=args.programmes,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    passthrough = list(argv if argv is not None else sys.argv[1:])
+    print(f"{'scenario':<20s} {'items':>10s} {'seconds':>9s} {'items/s':>11s} {'peak RSS':>10s}")
+    with FakePanel(config) as panel:
+        for name in args.scenario or SCENARIOS:
+            cmd = [sys.executable, "-m", "benchmarks.run", *passthrough, "--url", panel.url, "--child", name]
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout  # noqa: S603
+            result = Result(**json.loads(out))
+            print(f"{result.scenario:<20s} {result.items:>10d} {result.seconds:>9.2f} {result.rate:>11.0f} {result.peak_rss_mib:>7.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
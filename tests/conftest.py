@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Any, Final
+
+import pytest
+
+from benchmarks.fake_server import FakePanel, FakePanelConfig
+from xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+# Small enough for every test to run in well under a second against a local panel.
+SMALL_PANEL: Final[FakePanelConfig] = FakePanelConfig(
+    live_streams=30,
+    vod_streams=40,
+    series=10,
+    categories=5,
+    seasons_per_series=2,
+    episodes_per_season=3,
+    epg_channels=5,
+    programmes_per_channel=2,
+)
+
+
+# Starts FakePanels on free local ports, SMALL_PANEL with `overrides` applied; all of them are stopped after the test.
+@pytest.fixture
+def make_panel() -> Iterator[Callable[..., FakePanel]]:
+    panels: list[FakePanel] = []
+
+    def make(**overrides: Any) -> FakePanel:  # noqa: ANN401
+        panel = FakePanel(dataclasses.replace(SMALL_PANEL, **overrides)).start()
+        panels.append(panel)
+        return panel
+
+    yield make
+    for panel in panels:
+        panel.stop()
+
+
+@pytest.fixture
+def panel(make_panel: Callable[..., FakePanel]) -> FakePanel:
+    return make_panel()
+
+
+@pytest.fixture
+def client(panel: FakePanel) -> Iterator[XTream]:
+    with XTream(panel.url, "user", "pass") as client:
+        yield client
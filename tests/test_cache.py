@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from xtream import ResponseCache, XTream
+
+if TYPE_CHECKING:
+    from benchmarks.fake_server import FakePanel
+
+TTL = 0.2
+
+
+def _client(panel: FakePanel, cache: ResponseCache, username: str = "user") -> XTream:
+    return XTream(panel.url, username, "pass", cache=cache)
+
+
+def test_fresh_entries_are_served_locally(panel: FakePanel) -> None:
+    with _client(panel, ResponseCache()) as client:
+        first = client.categories(XTream.vod_type).content
+        assert client.categories(XTream.vod_type).content == first
+    assert panel.requests == 1
+
+
+def test_stale_entry_is_revalidated(panel: FakePanel) -> None:
+    with _client(panel, ResponseCache(ttls={"get_live_categories": TTL})) as client:
+        first = client.categories(XTream.live_type)
+        time.sleep(TTL * 1.5)
+        second = client.categories(XTream.live_type)
+        # The 304 refreshed the entry, so this one is local again.
+        third = client.categories(XTream.live_type)
+    assert panel.requests == 2
+    assert panel.not_modified == 1
+    assert second.status_code == 200
+    assert first.content == second.content == third.content
+
+
+def test_zero_ttl_is_not_cached(panel: FakePanel) -> None:
+    with _client(panel, ResponseCache(ttls={"get_live_categories": 0})) as client:
+        client.categories(XTream.live_type)
+        client.categories(XTream.live_type)
+    assert panel.requests == 2
+
+
+def test_authentication_is_never_cached(panel: FakePanel) -> None:
+    with _client(panel, ResponseCache()) as client:
+        client.authenticate()
+        client.authenticate()
+    assert panel.requests == 2
+
+
+def test_accounts_do_not_share_entries(panel: FakePanel) -> None:
+    cache = ResponseCache()
+    with _client(panel, cache, "alice") as alice, _client(panel, cache, "bob") as bob:
+        alice.categories(XTream.vod_type)
+        bob.categories(XTream.vod_type)
+        alice.categories(XTream.vod_type)
+    assert panel.requests == 2
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from xtream import Crawler, Snapshot, XTream
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from benchmarks.fake_server import FakePanel
+
+STREAM_TYPES = (XTream.vod_type, XTream.series_type)
+TITLES = 50
+
+
+def _info_ids(path: Path) -> list[int]:
+    return [json.loads(line)["id"] for line in path.read_text().splitlines()]
+
+
+def test_full_crawl(tmp_path: Path, client: XTream) -> None:
+    crawler = Crawler(client, tmp_path, STREAM_TYPES, workers=4)
+    assert crawler.run() == 0
+    assert sorted(_info_ids(tmp_path / "vod-info.jsonl")) == list(range(31, 71))
+    assert sorted(_info_ids(tmp_path / "series-info.jsonl")) == list(range(1, 11))
+    crawler.write_snapshot(tmp_path / "catalog.snap")
+    with Snapshot(tmp_path / "catalog.snap") as snapshot:
+        assert len(snapshot.streams(XTream.vod_type)) == 40
+        assert snapshot.info(XTream.series_type, 4) == client.decode(client.series_info_by_id("4"))
+
+
+# An interrupted crawl leaves its info files with a line cut short; the next run drops it, skips the listings
+# and every title already on disk, and fetches only the rest.
+def test_resume(tmp_path: Path, panel: FakePanel) -> None:
+    with XTream(panel.url, "user", "pass") as client:
+        assert Crawler(client, tmp_path, STREAM_TYPES, workers=4).run() == 0
+    vod_info = tmp_path / "vod-info.jsonl"
+    lines = vod_info.read_bytes().splitlines(keepends=True)
+    kept = 15
+    vod_info.write_bytes(b"".join(lines[:kept]) + lines[kept][:20])
+    (tmp_path / "series-info.jsonl").unlink()
+
+    before = panel.requests
+    with XTream(panel.url, "user", "pass") as client:
+        assert Crawler(client, tmp_path, STREAM_TYPES, workers=4).run() == 0
+    assert panel.requests - before == TITLES - kept
+    ids = _info_ids(vod_info)
+    assert len(ids) == len(set(ids)) == 40
+    assert sorted(_info_ids(tmp_path / "series-info.jsonl")) == list(range(1, 11))
+
+
+def test_restart(tmp_path: Path, panel: FakePanel) -> None:
+    with XTream(panel.url, "user", "pass") as client:
+        Crawler(client, tmp_path, STREAM_TYPES).run()
+        before = panel.requests
+        Crawler(client, tmp_path, STREAM_TYPES).run(restart=True)
+    # Both listings (categories and streams) and every title again.
+    assert panel.requests - before == 2 * len(STREAM_TYPES) + TITLES
+    assert len(_info_ids(tmp_path / "vod-info.jsonl")) == 40
+
+
+def test_checkpoint_of_another_account(tmp_path: Path, panel: FakePanel) -> None:
+    with XTream(panel.url, "user", "pass") as client:
+        Crawler(client, tmp_path, STREAM_TYPES, fetch_info=False).run()
+    with XTream(panel.url, "someone-else", "pass") as other, pytest.raises(ValueError, match="belongs to"):
+        Crawler(other, tmp_path, STREAM_TYPES).run()
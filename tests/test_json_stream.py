@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from xtream import iter_json_array
+
+if TYPE_CHECKING:
+    from xtream import XTream
+
+LISTING: list[Any] = [
+    {"name": "Café |FR| HD", "stream_id": 12345, "rating": 4.75, "tags": ["a", "b"], "icon": None},
+    {"name": "日本語チャンネル", "stream_id": -7, "rating": 1e-3, "nested": {"deep": [1, [2, [3]]]}},
+    'a string with "escapes", \\ backslashes and \u00e9',
+    1234567890,
+    3.5,
+    True,
+    None,
+    [],
+    {},
+]
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_fixed_chunk_sizes(size: int) -> None:
+    data = json.dumps(LISTING, ensure_ascii=False).encode()
+    assert list(iter_json_array(_chunks(data, size))) == LISTING
+
+
+# Every possible split point, which covers multi-byte characters, numbers, literals and escapes cut in two.
+def test_every_split_point() -> None:
+    data = json.dumps(LISTING, ensure_ascii=False, indent=1).encode()
+    for split in range(len(data) + 1):
+        assert list(iter_json_array([data[:split], data[split:]])) == LISTING, split
+
+
+def test_number_cut_at_chunk_end() -> None:
+    assert list(iter_json_array([b"[12", b"34, 5.", b"25e1", b"0]"])) == [1234, 5.25e10]
+
+
+def test_bom_whitespace_and_empty_chunks() -> None:
+    chunks = [b"\xef\xbb", b"\xbf", b"", b" \n [ ", b"", b'{"a": 1} ,\r\n', b'{"b": 2}', b" ] \n"]
+    assert list(iter_json_array(chunks)) == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.parametrize("data", [b"", b"   ", b"[]", b" [ \n ] "])
+def test_empty(data: bytes) -> None:
+    assert list(iter_json_array(_chunks(data, 1))) == []
+
+
+def test_object_instead_of_array() -> None:
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(iter_json_array(_chunks(b'{"user_info": {"auth": 0}}', 4)))
+
+
+def test_unterminated_array() -> None:
+    it = iter_json_array(_chunks(b'[{"a": 1}, {"b": 2}', 3))
+    assert next(it) == {"a": 1}
+    with pytest.raises(ValueError, match="Unterminated"):
+        list(it)
+
+
+def test_listing_from_panel(client: XTream) -> None:
+    streams = list(client.iter_streams(client.live_type, chunk_size=17))
+    assert [s["stream_id"] for s in streams] == list(range(1, 31))
+    assert streams == client.decode(client.streams(client.live_type))
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from benchmarks.fake_server import FakePanel
+
+
+@pytest.mark.parametrize(("page_size", "prefetch"), [(1, 0), (7, 2), (10, 4), (30, 1), (100, 3)])
+def test_paged_matches_listing(client: XTream, page_size: int, prefetch: int) -> None:
+    paged = list(client.iter_streams_paged(XTream.vod_type, page_size=page_size, prefetch=prefetch))
+    assert paged == client.decode(client.streams(XTream.vod_type))
+
+
+def test_paged_by_category(client: XTream) -> None:
+    paged = list(client.iter_streams_by_category_paged(XTream.live_type, "2", page_size=2, prefetch=2))
+    assert [s["stream_id"] for s in paged] == [1, 6, 11, 16, 21, 26]
+
+
+# A panel that ignores offset/items_per_page answers every page with the whole listing: it must be yielded once,
+# and no further pages prefetched.
+@pytest.mark.parametrize("page_size", [7, 10, 30, 100])
+def test_panel_ignoring_pagination(make_panel: Callable[..., FakePanel], page_size: int) -> None:
+    panel = make_panel(live_streams=30, paginate=False)
+    with XTream(panel.url, "user", "pass") as client:
+        paged = list(client.iter_streams_paged(XTream.live_type, page_size=page_size, prefetch=8))
+    assert [s["stream_id"] for s in paged] == list(range(1, 31))
+    assert panel.requests == (2 if page_size == 30 else 1)
+
+
+def test_invalid_page_size(client: XTream) -> None:
+    with pytest.raises(ValueError, match="page_size"):
+        list(client.iter_streams_paged(XTream.live_type, page_size=0))
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from xtream import XTream
+from xtream._singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from benchmarks.fake_server import FakePanel
+
+CALLERS = 8
+
+
+def test_concurrent_requests_share_one_round_trip(make_panel: Callable[..., FakePanel]) -> None:
+    panel = make_panel(latency=0.2)
+    barrier = threading.Barrier(CALLERS)
+
+    def fetch(_: int) -> bytes:
+        barrier.wait()
+        return client.categories(XTream.live_type).content
+
+    with XTream(panel.url, "user", "pass") as client, ThreadPoolExecutor(CALLERS) as executor:
+        bodies = list(executor.map(fetch, range(CALLERS)))
+    assert panel.requests == 1
+    assert len(set(bodies)) == 1
+
+
+def test_distinct_requests_are_not_coalesced(make_panel: Callable[..., FakePanel]) -> None:
+    panel = make_panel(latency=0.1)
+    with XTream(panel.url, "user", "pass") as client, ThreadPoolExecutor(3) as executor:
+        list(executor.map(client.categories, [XTream.live_type, XTream.vod_type, XTream.series_type]))
+    assert panel.requests == 3
+
+
+# Callers arriving while the leader runs get its exception; once it returned, the next call runs again.
+def test_error_is_shared_then_forgotten() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = 0
+
+    def fail() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait()
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    errors: list[BaseException] = []
+
+    def call() -> None:
+        try:
+            flight.do("key", fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+    assert calls == 1
+    assert len(errors) == 4
+    assert all(e is errors[0] for e in errors)
+    assert flight.in_flight() == 0
+    assert flight.do("key", lambda: 42) == 42
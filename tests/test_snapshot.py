@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from xtream import Catalog, CatalogStore, LiveStream, Snapshot, VodStream, XTream
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from benchmarks.fake_server import FakePanel
+
+STREAM_TYPES = (XTream.live_type, XTream.vod_type, XTream.series_type)
+
+
+@pytest.fixture
+def catalogs(client: XTream) -> dict[str, Catalog]:
+    return {stream_type: Catalog.fetch(client, stream_type) for stream_type in STREAM_TYPES}
+
+
+def test_round_trip(tmp_path: Path, catalogs: dict[str, Catalog]) -> None:
+    info = {XTream.vod_type: {31: b'{"info": {"name": "Movie 1"}}', 32: {"info": {"name": "Movie 2"}}}}
+    Snapshot.write(tmp_path / "catalog.snap", catalogs.values(), info)
+    with Snapshot(tmp_path / "catalog.snap") as snapshot:
+        assert sorted(snapshot.stream_types()) == sorted(STREAM_TYPES)
+        for stream_type, catalog in catalogs.items():
+            assert list(snapshot.streams(stream_type)) == list(catalog)
+            assert list(snapshot.categories(stream_type)) == list(catalog.categories.values())
+        assert snapshot.info(XTream.vod_type, 31) == {"info": {"name": "Movie 1"}}
+        assert snapshot.info(XTream.vod_type, 32) == {"info": {"name": "Movie 2"}}
+        assert snapshot.info(XTream.vod_type, 33) is None
+        assert snapshot.info(XTream.series_type, 1) is None
+
+
+def test_table_access(tmp_path: Path, catalogs: dict[str, Catalog]) -> None:
+    Snapshot.write(tmp_path / "catalog.snap", catalogs.values())
+    with Snapshot(tmp_path / "catalog.snap") as snapshot:
+        table = snapshot.streams(XTream.vod_type)
+        records = list(catalogs[XTream.vod_type])
+        assert len(table) == len(records)
+        assert table[0] == records[0]
+        assert table[-1] == records[-1]
+        assert table.get(records[5].key) == records[5]
+        assert table.get(-1) is None
+        # custom_sid is None in every fake VOD listing and must not come back as "".
+        assert all(record.custom_sid is None for record in table)
+        assert list(table.column("stream_id")) == [record.key for record in records]
+        with pytest.raises(IndexError):
+            table[len(table)]
+
+
+def test_catalog_from_snapshot(tmp_path: Path, catalogs: dict[str, Catalog]) -> None:
+    Snapshot.write(tmp_path / "catalog.snap", catalogs.values())
+    with Snapshot(tmp_path / "catalog.snap") as snapshot:
+        live = Catalog.from_snapshot(snapshot, XTream.live_type)
+        original = catalogs[XTream.live_type]
+        assert len(live) == len(original)
+        assert live.counts() == original.counts()
+        assert live.in_category("3") == original.in_category("3")
+        assert live.by_epg_channel("ch4.example") == original.by_epg_channel("ch4.example")
+        assert isinstance(live.get_live(4), LiveStream)
+        assert live.get_vod(4) is None
+        vod = Catalog.from_snapshot(snapshot, XTream.vod_type)
+        removed = vod.remove(31)
+        assert isinstance(removed, VodStream)
+        assert 31 not in vod
+        vod.materialize()
+    assert len(list(vod)) == len(catalogs[XTream.vod_type]) - 1
+
+
+def test_bad_file(tmp_path: Path) -> None:
+    path = tmp_path / "catalog.snap"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError, match="not an xtream snapshot"):
+        Snapshot(path)
+
+
+def test_store_keeps_info_across_restarts(tmp_path: Path, panel: FakePanel) -> None:
+    path = tmp_path / "catalog.snap"
+    with XTream(panel.url, "user", "pass") as client, CatalogStore(client, path, STREAM_TYPES[1:]) as store:
+        assert not store.load()
+        store.refresh()
+        info = store.info(XTream.series_type, 3)
+        store.save()
+    requests = panel.requests
+    with XTream(panel.url, "user", "pass") as client, CatalogStore(client, path, STREAM_TYPES[1:]) as store:
+        assert store.load()
+        assert len(store.catalog(XTream.vod_type)) == 40
+        assert store.info(XTream.series_type, 3) == info
+    assert panel.requests == requests
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import datetime
 import json
+import operator
 from pathlib import Path
 from typing import Any, Final
 
@@ -114,20 +115,16 @@ try:
 
     writeJSON(providername + "-live-streams.json", live_stream_data)
 
+    live_catalog = xtream.Catalog.from_json(x.live_type, live_category_data, live_stream_data)
+
     # live_category_data is list of dict
     live_names = []
     live_ids = []
-    pos = 0
-    while pos <= len(live_category_data) - 1:
-        cat_streams_data = [item for item in live_stream_data if item["category_id"] == live_category_data[pos]["category_id"]]
-        live_names.append(
-            "{:<40s} - {:>3s} - {:4d} streams".format(
-                live_category_data[pos]["category_name"], live_category_data[pos]["category_id"], len(cat_streams_data)
-            )
-        )
-        total_streams += len(cat_streams_data)
-        live_ids.append(live_category_data[pos]["category_id"])
-        pos += 1
+    for category in live_catalog.categories.values():
+        stream_count = live_catalog.count(category.category_id)
+        live_names.append(f"{category.category_name:<40s} - {category.category_id:>3s} - {stream_count:4d} streams")
+        total_streams += stream_count
+        live_ids.append(category.category_id)
     live_names.sort()
 
     if len(live_category_data) > 0:
@@ -153,19 +150,15 @@ try:
 
     writeJSON(providername + "-vod-streams.json", vod_stream_data)
 
+    vod_catalog = xtream.Catalog.from_json(x.vod_type, vod_category_data, vod_stream_data)
+
     vod_names = []
     vod_ids = []
-    pos = 0
-    while pos <= len(vod_category_data) - 1:
-        cat_streams_data = [item for item in vod_stream_data if item["category_id"] == vod_category_data[pos]["category_id"]]
-        vod_names.append(
-            "{:<40s} - {:>3s} - {:4d} streams".format(
-                vod_category_data[pos]["category_name"], vod_category_data[pos]["category_id"], len(cat_streams_data)
-            )
-        )
-        total_streams += len(cat_streams_data)
-        vod_ids.append(vod_category_data[pos]["category_id"])
-        pos += 1
+    for category in vod_catalog.categories.values():
+        stream_count = vod_catalog.count(category.category_id)
+        vod_names.append(f"{category.category_name:<40s} - {category.category_id:>3s} - {stream_count:4d} streams")
+        total_streams += stream_count
+        vod_ids.append(category.category_id)
     vod_names.sort()
 
     if len(vod_category_data) > 0:
@@ -190,17 +183,21 @@ try:
 
     writeJSON(providername + "-series-streams.json", series_stream_data)
 
+    series_catalog = xtream.Catalog.from_json(x.series_type, series_category_data, series_stream_data)
+
+    # The per-category files keep the panel's raw objects; the catalog is only used for counts.
+    series_data_by_category: dict[str, list[dict[str, Any]]] = {}
+    for item in series_stream_data:
+        series_data_by_category.setdefault(str(item.get("category_id") or ""), []).append(item)
+
     series_names = []
     series_ids = []
 
-    pos = 0
-    while pos <= len(series_category_data) - 1:
-        cat_streams_data = [item for item in series_stream_data if item["category_id"] == series_category_data[pos]["category_id"]]
-        writeJSON(series_category_data[pos]["category_id"] + "-stream-data.json", cat_streams_data)
-        series_names.append("{:<47s} - {:>3s}".format(series_category_data[pos]["category_name"], series_category_data[pos]["category_id"]))
-        total_streams += len(cat_streams_data)
-        series_ids.append(series_category_data[pos]["category_id"])
-        pos += 1
+    for category in series_catalog.categories.values():
+        writeJSON(category.category_id + "-stream-data.json", series_data_by_category.get(category.category_id, []))
+        series_names.append(f"{category.category_name:<47s} - {category.category_id:>3s}")
+        total_streams += series_catalog.count(category.category_id)
+        series_ids.append(category.category_id)
     series_names.sort()
 
     if len(series_category_data) > 0:
@@ -222,21 +219,21 @@ if config.display_live_info == 1:
     live_category_data.sort(key=VODName)
     for _i, entry in enumerate(live_category_data):
         print("\n\nStreams for Live category {} - {}:\n".format(entry["category_id"], entry["category_name"]))
-        cat_streams_data = [item for item in live_stream_data if item["category_id"] == entry["category_id"]]
         print("{:<75s} {:>5s} {:>4s} ".format("name", "ID", "EPG?"))
         print("======================================================================================")
-        for _i, stream in enumerate(cat_streams_data):
-            print("{:<75s} {:>5d} {:>4s}".format(stream["name"], stream["stream_id"], EPGString(stream["epg_channel_id"])))
+        for live_stream in live_catalog.in_category(entry["category_id"]):
+            assert isinstance(live_stream, xtream.LiveStream)
+            print(f"{live_stream.name:<75s} {live_stream.stream_id:>5d} {EPGString(live_stream.epg_channel_id):>4s}")
         print("======================================================================================")
 
 if config.display_vod_info == 1:
     for _i, entry in enumerate(vod_category_data):
         print("\n\nStreams for VOD category {} - {}:\n".format(entry["category_id"], entry["category_name"]))
-        cat_streams_data = [item for item in vod_stream_data if item["category_id"] == entry["category_id"]]
-        cat_streams_data.sort(key=VODName)
+        cat_vod_streams = sorted(vod_catalog.in_category(entry["category_id"]), key=operator.attrgetter("name"))
         print("{:<75s} {:>5s} {:>5s} {:>4s} {:<6s} {:<6s} {:<9s} ".format("name", "ID", "Type", "Ext", "Video", "Audio", "W x H"))
         print("===================================================================================================================")
-        for _i, stream in enumerate(cat_streams_data):
+        for stream in cat_vod_streams:
+            assert isinstance(stream, xtream.VodStream)
             # {u'direct_source': u'',
             #  u'rating': u'',
             #  u'added': u'1518032077',
@@ -249,11 +246,11 @@ if config.display_vod_info == 1:
             #  u'container_extension': u'mp4',
             #  u'category_id': u'102',
             #  u'rating_5based': 0}
-            r = x.vod_info_by_id(stream["stream_id"])
+            r = x.vod_info_by_id(str(stream.stream_id))
             vod_stream_info = r.json()
 
             if config.write_vod_info_files == 1:
-                writeJSON(providername + "-vod-" + str(stream["stream_id"]) + "-info.json", vod_stream_info)
+                writeJSON(providername + "-vod-" + str(stream.stream_id) + "-info.json", vod_stream_info)
 
             try:
                 vcodec = vod_stream_info["info"]["video"]["codec_name"]
@@ -271,9 +268,8 @@ if config.display_vod_info == 1:
                 width = 0
                 height = 0
             print(
-                "{:<75s} {:>5d} {:>5s} {:>4s} {:<6s} {:<6s} {:<4d}x{:<4d} ".format(
-                    stream["name"], stream["stream_id"], stream["stream_type"], stream["container_extension"], vcodec, acodec, width, height
-                )
+                f"{stream.name:<75s} {stream.stream_id:>5d} {stream.stream_type:>5s} {stream.container_extension:>4s} "
+                f"{vcodec:<6s} {acodec:<6s} {width:<4d}x{height:<4d} "
             )
         print("===================================================================================================================")
 
@@ -282,20 +278,20 @@ if config.display_series_info == 1:
     print("==========================================================================")
     for _i, entry in enumerate(series_category_data):
         #     print('\n\nEpisodes for series category {} - {}:\n'.format(entry['category_id'],entry['category_name'])
-        cat_streams_data = [item for item in series_stream_data if item["category_id"] == entry["category_id"]]
-        for _i, stream in enumerate(cat_streams_data):
-            r = x.series_info_by_id(stream["series_id"])
+        for series in series_catalog.in_category(entry["category_id"]):
+            assert isinstance(series, xtream.Series)
+            r = x.series_info_by_id(str(series.series_id))
             try:
                 series_info = r.json()
 
                 if config.write_series_info_files == 1:
-                    writeJSON(providername + "-series-" + str(stream["series_id"]) + "-info.json", series_info)
+                    writeJSON(providername + "-series-" + str(series.series_id) + "-info.json", series_info)
 
                 season_count = len(series_info["episodes"])
                 episode_count = 0
                 for _i, ep_entry in enumerate(series_info["episodes"]):
                     episode_count += len(series_info["episodes"][str(ep_entry)])
-                print("{:<60s} {:>5d} {:>3d} {:>3d} ".format(stream["name"], stream["series_id"], season_count, episode_count))
+                print(f"{series.name:<60s} {series.series_id:>5d} {season_count:>3d} {episode_count:>3d} ")
             except ValueError as err:
                 print(f"Value error: {err} on series {err}")
     print("==========================================================================")
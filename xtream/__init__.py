@@ -1,3 +1,77 @@
+from xtream._async import AsyncXTream
+from xtream._cache import CachedResponse, MemoryCache, ResponseCache, SQLiteCache, TieredCache
+from xtream._catalog import Catalog
+from xtream._crawl import Crawler, CrawlProgress
+from xtream._decode import JsonDecoder, MsgspecDecoder, OrjsonDecoder, StdlibDecoder, get_decoder
+from xtream._epg import EpgIndex
+from xtream._episodes import EpisodeTable, iter_series_info
+from xtream._health import ChannelHealth, HealthStore, ProbeResult, StreamProber
+from xtream._json_stream import iter_json_array
+from xtream._limiter import AdaptiveLimiter, CircuitOpenError
+from xtream._metrics import CallbackSink, HistogramSink, MetricsSink, MultiSink, RequestMetrics
+from xtream._models import Category, EpgEntry, LiveStream, Series, StreamRecord, StreamTable, VodStream
+from xtream._now_next import ShortEpgFetcher
+from xtream._playlist import M3UWriter, StreamUrlBuilder
+from xtream._pool import MergedTitle, PoolAccount, XTreamPool
+from xtream._search import SearchIndex, SearchResult, normalize_name
+from xtream._snapshot import CatalogStore, Snapshot, SnapshotTable
+from xtream._sync import CatalogSync, ChangeSet
+from xtream._xmltv import Channel, Programme, iter_xmltv
 from xtream._xtream import XTream
 
-__all__ = ["XTream"]
+__all__ = [
+    "AdaptiveLimiter",
+    "AsyncXTream",
+    "CachedResponse",
+    "CallbackSink",
+    "Catalog",
+    "CatalogStore",
+    "CatalogSync",
+    "Category",
+    "ChangeSet",
+    "Channel",
+    "ChannelHealth",
+    "CircuitOpenError",
+    "CrawlProgress",
+    "Crawler",
+    "EpgEntry",
+    "EpgIndex",
+    "EpisodeTable",
+    "HealthStore",
+    "HistogramSink",
+    "JsonDecoder",
+    "LiveStream",
+    "M3UWriter",
+    "MemoryCache",
+    "MergedTitle",
+    "MetricsSink",
+    "MsgspecDecoder",
+    "MultiSink",
+    "OrjsonDecoder",
+    "PoolAccount",
+    "ProbeResult",
+    "Programme",
+    "RequestMetrics",
+    "ResponseCache",
+    "SQLiteCache",
+    "SearchIndex",
+    "SearchResult",
+    "Series",
+    "ShortEpgFetcher",
+    "Snapshot",
+    "SnapshotTable",
+    "StdlibDecoder",
+    "StreamProber",
+    "StreamRecord",
+    "StreamTable",
+    "StreamUrlBuilder",
+    "TieredCache",
+    "VodStream",
+    "XTream",
+    "XTreamPool",
+    "get_decoder",
+    "iter_json_array",
+    "iter_series_info",
+    "iter_xmltv",
+    "normalize_name",
+]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import requests
+
+from xtream._crawl import Crawler, CrawlProgress
+from xtream._health import HealthStore, StreamProber
+from xtream._limiter import AdaptiveLimiter
+from xtream._xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+STREAM_TYPES = {stream_type.lower(): stream_type for stream_type in (XTream.live_type, XTream.vod_type, XTream.series_type)}
+
+
+def _print_progress(progress: CrawlProgress) -> None:
+    eta = "" if progress.eta is None else f", {progress.eta / 60:.0f} min left"
+    failed = f", {progress.failed} failed" if progress.failed else ""
+    sys.stderr.write(f"\r{progress.stage}: {progress.done}/{progress.total} ({progress.rate:.1f}/s{failed}{eta})\x1b[K")
+    if progress.done >= progress.total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="xtream", description="Xtream Codes API client")
+    account = argparse.ArgumentParser(add_help=False)
+    account.add_argument("--server", default=os.environ.get("XTREAM_SERVER"), help="panel URL (default: $XTREAM_SERVER)")
+    account.add_argument("--username", default=os.environ.get("XTREAM_USERNAME"), help="default: $XTREAM_USERNAME")
+    account.add_argument("--password", default=os.environ.get("XTREAM_PASSWORD"), help="default: $XTREAM_PASSWORD")
+    account.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    account.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+    crawl = commands.add_parser(
+        "crawl",
+        parents=[account],
+        help="crawl categories, streams and per-title info to JSON Lines files, resuming an interrupted crawl",
+    )
+    crawl.add_argument("-o", "--out", default="data", help="output and checkpoint directory (default: %(default)s)")
+    crawl.add_argument(
+        "-t",
+        "--types",
+        nargs="+",
+        choices=sorted(STREAM_TYPES),
+        default=sorted(STREAM_TYPES),
+        help="stream types to crawl (default: all)",
+    )
+    crawl.add_argument("-w", "--workers", type=int, default=Crawler.DEFAULT_WORKERS, help="parallel requests (default: %(default)s)")
+    crawl.add_argument("--rate", type=float, help="cap requests per second to the panel")
+    crawl.add_argument("--no-info", action="store_true", help="skip get_vod_info / get_series_info")
+    crawl.add_argument("--snapshot", help="also write a catalog snapshot to this path when done")
+    crawl.add_argument("--restart", action="store_true", help="ignore the checkpoint and crawl everything again")
+    crawl.set_defaults(run=crawl_command)
+    probe = commands.add_parser("probe", parents=[account], help="check which live streams play and update their health scores")
+    probe.add_argument("-s", "--store", default="health.json", help="health score file, updated in place (default: %(default)s)")
+    probe.add_argument("-c", "--connections", type=int, help="probes at once (default: the account's free connections)")
+    probe.add_argument("--extension", help="live container to request (default: picked from allowed_output_formats)")
+    probe.add_argument(
+        "--timeout", type=float, default=StreamProber.DEFAULT_CONNECT_TIMEOUT, help="connect timeout in seconds (default: %(default)s)"
+    )
+    probe.add_argument("ids", nargs="*", type=int, help="stream ids to probe (default: every live stream)")
+    probe.set_defaults(run=probe_command)
+    return parser
+
+
+def _missing_account(args: argparse.Namespace) -> bool:
+    missing = [name for name in ("server", "username", "password") if not getattr(args, name)]
+    if missing:
+        sys.stderr.write(f"xtream {args.command}: missing {', '.join('--' + name for name in missing)}\n")
+    return bool(missing)
+
+
+def crawl_command(args: argparse.Namespace) -> int:
+    if _missing_account(args):
+        return 2
+    limiter = AdaptiveLimiter(rate=args.rate) if args.rate else None
+    with XTream(args.server, args.username, args.password, pool_size=max(args.workers, XTream.DEFAULT_POOL_SIZE), limiter=limiter) as client:
+        crawler = Crawler(
+            client,
+            args.out,
+            [STREAM_TYPES[name] for name in args.types],
+            workers=args.workers,
+            fetch_info=not args.no_info,
+            progress=None if args.quiet else _print_progress,
+        )
+        failed = crawler.run(restart=args.restart)
+        if args.snapshot:
+            crawler.write_snapshot(args.snapshot)
+    if failed:
+        sys.stderr.write(f"{failed} titles failed; run the same command again to retry them\n")
+        return 1
+    return 0
+
+
+def probe_command(args: argparse.Namespace) -> int:
+    if _missing_account(args):
+        return 2
+    store = HealthStore(args.store)
+    with XTream(args.server, args.username, args.password) as client:
+        prober = StreamProber(client, connections=args.connections, live_extension=args.extension, connect_timeout=args.timeout)
+        results = prober.probe(args.ids) if args.ids else prober.probe_all()
+        started, checked, failed = time.monotonic(), 0, 0
+        try:
+            # Raises LookupError before the first probe when the account has no free connection.
+            for result in results:
+                store.update(result)
+                checked += 1
+                failed += not result.ok
+                if not args.quiet and checked % 50 == 0:
+                    sys.stderr.write(f"\rprobed {checked} ({failed} failed, {checked / (time.monotonic() - started):.1f}/s)\x1b[K")
+        except LookupError as e:
+            sys.stderr.write(f"xtream probe: {e}; stop a player or pass --connections\n")
+            return 1
+        finally:
+            # Whatever was probed before an interruption is kept.
+            store.save()
+    if not args.quiet:
+        sys.stderr.write(f"\rprobed {checked}: {checked - failed} playing, {failed} failed\x1b[K\n")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        return args.run(args)
+    except (requests.RequestException, ValueError) as e:
+        sys.stderr.write(f"xtream {args.command}: {e}\n")
+        return 1
+    except KeyboardInterrupt:
+        sys.stderr.write("\ninterrupted; run the same command again to resume\n")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Final, Self, TypeVar
+
+from xtream._xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+    from types import TracebackType
+
+    import requests
+
+    from xtream._cache import ResponseCache
+    from xtream._decode import JsonDecoder
+    from xtream._limiter import AdaptiveLimiter
+    from xtream._metrics import MetricsSink
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncXTream:
+    DEFAULT_CONCURRENCY: Final[int] = 16
+
+    live_type = XTream.live_type
+    vod_type = XTream.vod_type
+    series_type = XTream.series_type
+
+    # The blocking client does the HTTP work; every call is dispatched onto a worker pool that is exactly
+    # as wide as the connection pool, so the number of in-flight requests, threads and sockets are all
+    # bounded by `concurrency` no matter how many coroutines are awaiting. `cache`, `metrics`, `decoder` and
+    # `limiter` are handed to that client and behave exactly as they do for XTream.
+    def __init__(  # noqa: PLR0913
+        self,
+        server: str,
+        username: str,
+        password: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        *,
+        cache: ResponseCache | None = None,
+        metrics: MetricsSink | None = None,
+        decoder: JsonDecoder | str = "json",
+        limiter: AdaptiveLimiter | None = None,
+    ) -> None:
+        if concurrency < 1:
+            msg = f"concurrency must be >= 1, got {concurrency}"
+            raise ValueError(msg)
+        self.concurrency = concurrency
+        self._client = XTream(
+            server,
+            username,
+            password,
+            pool_size=concurrency,
+            cache=cache,
+            metrics=metrics,
+            decoder=decoder,
+            limiter=limiter,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="xtream")
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def server(self) -> str:
+        return self._client.server
+
+    @property
+    def username(self) -> str:
+        return self._client.username
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._client.close()
+
+    async def authenticate(self) -> requests.Response:
+        return await self._call(self._client.authenticate)
+
+    async def categories(self, stream_type: str) -> requests.Response:
+        return await self._call(self._client.categories, stream_type)
+
+    async def streams(self, stream_type: str) -> requests.Response:
+        return await self._call(self._client.streams, stream_type)
+
+    async def streams_by_category(self, stream_type: str, category_id: str) -> requests.Response:
+        return await self._call(self._client.streams_by_category, stream_type, category_id)
+
+    async def series_info_by_id(self, series_id: str) -> requests.Response:
+        return await self._call(self._client.series_info_by_id, series_id)
+
+    async def vod_info_by_id(self, vod_id: str) -> requests.Response:
+        return await self._call(self._client.vod_info_by_id, vod_id)
+
+    async def live_epg_by_stream(self, stream_id: str) -> requests.Response:
+        return await self._call(self._client.live_epg_by_stream, stream_id)
+
+    async def live_epg_by_stream_and_limit(self, stream_id: str, limit: int) -> requests.Response:
+        return await self._call(self._client.live_epg_by_stream_and_limit, stream_id, limit)
+
+    async def all_live_epg_by_stream(self, stream_id: str) -> requests.Response:
+        return await self._call(self._client.all_live_epg_by_stream, stream_id)
+
+    async def all_epg(self) -> requests.Response:
+        return await self._call(self._client.all_epg)
+
+    # XTream.decode on a worker thread, so decoding a large listing does not block the event loop.
+    async def decode(self, response: requests.Response) -> Any:  # noqa: ANN401
+        return await self._call(self._client.decode, response)
+
+    # Fan-out helpers: yield (id, response) pairs in completion order while keeping at most `concurrency`
+    # requests outstanding, so crawling a 60k-title catalog never materializes 60k tasks at once.
+    def iter_vod_info(self, vod_ids: Iterable[str]) -> AsyncIterator[tuple[str, requests.Response]]:
+        return self.fan_out(self.vod_info_by_id, vod_ids)
+
+    def iter_series_info(self, series_ids: Iterable[str]) -> AsyncIterator[tuple[str, requests.Response]]:
+        return self.fan_out(self.series_info_by_id, series_ids)
+
+    def iter_live_epg(self, stream_ids: Iterable[str]) -> AsyncIterator[tuple[str, requests.Response]]:
+        return self.fan_out(self.live_epg_by_stream, stream_ids)
+
+    async def fan_out(
+        self,
+        fn: Callable[[str], Awaitable[T]],
+        ids: Iterable[str],
+    ) -> AsyncIterator[tuple[str, T]]:
+        pending: dict[asyncio.Future[T], str] = {}
+        it = iter(ids)
+        try:
+            for key in it:
+                pending[asyncio.ensure_future(fn(key))] = key
+                if len(pending) >= self.concurrency:
+                    break
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    key = pending.pop(fut)
+                    yield key, fut.result()
+                    nxt = next(it, None)
+                    if nxt is not None:
+                        pending[asyncio.ensure_future(fn(nxt))] = nxt
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
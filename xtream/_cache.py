@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Protocol
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+MINUTE: Final[float] = 60.0
+HOUR: Final[float] = 60 * MINUTE
+
+# Listings that rarely change are kept for a long time, catalogs for a while, EPG only briefly. Actions that
+# are not listed fall back to ResponseCache.default_ttl; a TTL of 0 disables caching for that action.
+DEFAULT_TTLS: Final[Mapping[str, float]] = {
+    "get_live_categories": 24 * HOUR,
+    "get_vod_categories": 24 * HOUR,
+    "get_series_categories": 24 * HOUR,
+    "get_live_streams": HOUR,
+    "get_vod_streams": HOUR,
+    "get_series": HOUR,
+    "get_vod_info": 6 * HOUR,
+    "get_series_info": 6 * HOUR,
+    "get_short_epg": 5 * MINUTE,
+    "get_simple_data_table": 15 * MINUTE,
+}
+
+# The password never takes part in the cache key or the stored entry. The key covers the panel URL and a hash of
+# the username instead, so accounts on one panel (with different bouquets) never see each other's entries, even
+# through a shared SQLite file, and the username itself is not written to disk either.
+EXCLUDED_PARAMS: Final[frozenset[str]] = frozenset({"username", "password"})
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    expires_at: float
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("ETag") or self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("Last-Modified") or self.headers.get("last-modified")
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.url = self.url
+        # requests has no public constructor for a pre-read body; this mirrors what Response.content does.
+        response._content = self.content  # noqa: SLF001
+        response._content_consumed = True  # type: ignore[attr-defined]  # noqa: SLF001
+        return response
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    def set(self, key: str, entry: CachedResponse) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+# In-process LRU tier bounded by the total size of the cached bodies.
+class MemoryCache:
+    DEFAULT_MAX_BYTES: Final[int] = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Persistent tier backed by a single SQLite file, so cached listings survive restarts and can be shared by
+# worker processes on one host.
+class SQLiteCache:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT NOT NULL, status_code INTEGER NOT NULL, "
+            "headers TEXT NOT NULL, content BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, content, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, status_code, headers, content, expires_at = row
+        return CachedResponse(url, status_code, json.loads(headers), content, expires_at)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status_code, headers, content, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.url, entry.status_code, json.dumps(entry.headers), entry.content, entry.expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    # Drops entries that expired more than `grace` seconds ago (younger ones are kept for revalidation).
+    def prune(self, grace: float = 0.0) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time() - grace,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Looks tiers up in order and copies hits from slower tiers into faster ones.
+class TieredCache:
+    def __init__(self, *tiers: CacheBackend) -> None:
+        self.tiers = tiers
+
+    def get(self, key: str) -> CachedResponse | None:
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is not None:
+                for upper in self.tiers[:i]:
+                    upper.set(key, entry)
+                return entry
+        return None
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        for tier in self.tiers:
+            tier.set(key, entry)
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttls: Mapping[str, float] | None = None,
+        default_ttl: float = 0.0,
+    ) -> None:
+        self.backend: CacheBackend = backend if backend is not None else MemoryCache()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+
+    # Memory tier in front of an SQLite file.
+    @classmethod
+    def persistent(cls, path: str | Path, max_bytes: int = MemoryCache.DEFAULT_MAX_BYTES, **kwargs: Any) -> ResponseCache:  # noqa: ANN401
+        return cls(TieredCache(MemoryCache(max_bytes), SQLiteCache(path)), **kwargs)
+
+    def ttl(self, params: Mapping[str, Any] | None) -> float:
+        action = params.get("action") if params else None
+        if action is None:
+            # Authentication reports live connection counts; it is never cached.
+            return 0.0
+        return self.ttls.get(action, self.default_ttl)
+
+    @staticmethod
+    def key(url: str, params: Mapping[str, Any] | None, username: str | None = None) -> str:
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in EXCLUDED_PARAMS)
+        account = hashlib.sha256(username.encode()).hexdigest() if username is not None else None
+        return hashlib.sha256(json.dumps([url, account, items]).encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        return self.backend.get(key)
+
+    # Responses refusing the credentials are not stored: panels send them with status 200, and a cached one would
+    # keep failing the account after its password is fixed.
+    def store(self, key: str, response: requests.Response, ttl: float) -> None:
+        if _is_auth_failure(response.content):
+            logger.debug("Not caching an authentication failure from %s", urlsplit(response.url).path)
+            return
+        headers = {k: v for k, v in response.headers.items() if k.lower() in {"content-type", "etag", "last-modified", "date"}}
+        url = urlsplit(response.url)._replace(query="").geturl()
+        self.backend.set(key, CachedResponse(url, response.status_code, headers, response.content, time.time() + ttl))
+
+    # Called after a 304: the stored body is still valid for another `ttl` seconds.
+    def refresh(self, key: str, entry: CachedResponse, ttl: float) -> CachedResponse:
+        entry = replace(entry, expires_at=time.time() + ttl)
+        self.backend.set(key, entry)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+# {"user_info": {"auth": 0}}, the answer of most panels to bad credentials. Listings are arrays and info payloads
+# rarely mention user_info, so the body is only decoded when the marker is present.
+def _is_auth_failure(content: bytes) -> bool:
+    if b'"user_info"' not in content or not content.lstrip().startswith(b"{"):
+        return False
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return False
+    user_info = data.get("user_info") if isinstance(data, dict) else None
+    return isinstance(user_info, dict) and user_info.get("auth", 1) in {0, "0"}
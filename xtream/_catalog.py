@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import typing
+from typing import TYPE_CHECKING, Any, Self
+
+from xtream._models import Category, LiveStream, Series, VodStream
+from xtream._xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+    from xtream._models import StreamRecord
+    from xtream._snapshot import Snapshot, SnapshotTable
+
+
+# The categories and streams of one stream type (Live, VOD or Series), indexed as they are added so that
+# lookups by id, category or EPG channel and per-category grouping never rescan the listing. Records served from a
+# snapshot are kept as their row number until first accessed.
+class Catalog:
+    def __init__(self, stream_type: str, categories: Iterable[Category] = ()) -> None:
+        self.stream_type = stream_type
+        self.categories: dict[str, Category] = {}
+        self._by_id: dict[int, StreamRecord | int] = {}
+        self._by_category: dict[str, list[int]] = {}
+        self._by_epg_channel: dict[str, list[int]] = {}
+        self._table: SnapshotTable | None = None
+        for category in categories:
+            self.add_category(category)
+
+    @classmethod
+    def fetch(cls, client: XTream, stream_type: str) -> Self:
+        catalog = cls(stream_type, client.category_records(stream_type))
+        catalog.extend(client.iter_stream_records(stream_type))
+        return catalog
+
+    # Builds a catalog from already decoded categories()/streams() payloads.
+    @classmethod
+    def from_json(
+        cls,
+        stream_type: str,
+        categories: Iterable[Mapping[str, Any]],
+        streams: Iterable[Mapping[str, Any]],
+    ) -> Self:
+        model = XTream.stream_model(stream_type)
+        catalog = cls(stream_type, (Category.from_dict(data) for data in categories))
+        catalog.extend(model.from_dict(data) for data in streams)
+        return catalog
+
+    # Serves the records of `stream_type` from a snapshot file. Only the id, category and EPG channel columns are
+    # read up front; each record is built the first time it is accessed, so the catalog must not outlive the
+    # snapshot unless materialize() is called first.
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, stream_type: str) -> Self:
+        catalog = cls(stream_type, snapshot.categories(stream_type))
+        catalog._attach(snapshot.streams(stream_type))
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[StreamRecord]:
+        return (self._record(key) for key in self._by_id)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._by_id
+
+    def add_category(self, category: Category) -> None:
+        self.categories[category.category_id] = category
+        self._by_category.setdefault(category.category_id, [])
+
+    # Adds `record`, replacing any previous entry with the same id.
+    def add(self, record: StreamRecord) -> None:
+        if record.key in self._by_id:
+            self.remove(record.key)
+        self._by_id[record.key] = record
+        self._by_category.setdefault(record.category_id, []).append(record.key)
+        if isinstance(record, LiveStream) and record.epg_channel_id:
+            self._by_epg_channel.setdefault(record.epg_channel_id, []).append(record.key)
+
+    def extend(self, records: Iterable[StreamRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def remove(self, key: int) -> StreamRecord | None:
+        if key not in self._by_id:
+            return None
+        record = self._record(key)
+        del self._by_id[key]
+        self._by_category[record.category_id].remove(key)
+        if isinstance(record, LiveStream) and record.epg_channel_id:
+            channel = self._by_epg_channel[record.epg_channel_id]
+            channel.remove(key)
+            if not channel:
+                del self._by_epg_channel[record.epg_channel_id]
+        return record
+
+    # Lookup by stream_id (Live/VOD) or series_id (Series).
+    def get(self, key: int) -> StreamRecord | None:
+        return self._record(key) if key in self._by_id else None
+
+    def get_series(self, series_id: int) -> Series | None:
+        record = self.get(series_id)
+        return record if isinstance(record, Series) else None
+
+    def get_vod(self, stream_id: int) -> VodStream | None:
+        record = self.get(stream_id)
+        return record if isinstance(record, VodStream) else None
+
+    def get_live(self, stream_id: int) -> LiveStream | None:
+        record = self.get(stream_id)
+        return record if isinstance(record, LiveStream) else None
+
+    def in_category(self, category_id: str) -> Sequence[StreamRecord]:
+        return [self._record(key) for key in self._by_category.get(category_id, ())]
+
+    def count(self, category_id: str) -> int:
+        return len(self._by_category.get(category_id, ()))
+
+    def counts(self) -> dict[str, int]:
+        return {category_id: len(records) for category_id, records in self._by_category.items()}
+
+    def by_epg_channel(self, epg_channel_id: str) -> Sequence[LiveStream]:
+        return [typing.cast("LiveStream", self._record(key)) for key in self._by_epg_channel.get(epg_channel_id, ())]
+
+    # Yields every known category with its streams, followed by streams whose category was not listed.
+    def grouped(self) -> Iterator[tuple[Category, Sequence[StreamRecord]]]:
+        for category_id in self._by_category:
+            category = self.categories.get(category_id)
+            yield (category if category is not None else Category(category_id, category_id)), self.in_category(category_id)
+
+    # Builds every record still left in the snapshot, so the catalog stays usable once the snapshot is closed.
+    def materialize(self) -> None:
+        for key in self._by_id:
+            self._record(key)
+        self._table = None
+
+    def _attach(self, table: SnapshotTable) -> None:
+        keys = table.keys()
+        for row, (key, category_id) in enumerate(zip(keys, table.column("category_id"), strict=True)):
+            self._by_id[key] = row
+            self._by_category.setdefault(category_id, []).append(key)
+        if table.model is LiveStream:
+            for key, epg_channel_id in zip(keys, table.column("epg_channel_id"), strict=True):
+                if epg_channel_id:
+                    self._by_epg_channel.setdefault(epg_channel_id, []).append(key)
+        self._table = table
+
+    def _record(self, key: int) -> StreamRecord:
+        record = self._by_id[key]
+        if isinstance(record, int):
+            record = self._by_id[key] = typing.cast("SnapshotTable", self._table)[record]
+        return record
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Final
+
+import requests
+
+from xtream._catalog import Catalog
+from xtream._fanout import iter_completed
+from xtream._models import Series
+from xtream._snapshot import Snapshot
+from xtream._xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION: Final[int] = 1
+_INFO_ID: Final = re.compile(rb'^\{"id": ?(-?\d+)')
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlProgress:
+    stage: str
+    done: int
+    total: int
+    failed: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Seconds left at the current rate, None until there is a rate to go by.
+    @property
+    def eta(self) -> float | None:
+        return (self.total - self.done) / self.rate if self.rate > 0 else None
+
+
+# Crawls categories, stream listings and per-title info (get_vod_info / get_series_info) into `out_dir`:
+#
+#   <type>-categories.json   the decoded categories listing
+#   <type>-streams.jsonl     one stream/series object per line
+#   <type>-info.jsonl        {"id": <stream or series id>, "info": <payload>} per line, appended as fetched
+#   checkpoint.json          which listings are complete, and for which account
+#
+# Listings are written to a temporary file and renamed when complete. The info files double as the checkpoint
+# for the info stage: a resumed crawl skips every id already in them (dropping a line cut short by a crash) and
+# only fetches the rest, so titles that failed are simply retried by the next run.
+class Crawler:
+    DEFAULT_WORKERS: Final[int] = 8
+    DEFAULT_PROGRESS_INTERVAL: Final[float] = 1.0
+    # The info files are flushed after every this many titles written.
+    FLUSH_EVERY: Final[int] = 100
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: XTream,
+        out_dir: str | Path,
+        stream_types: Iterable[str] = (XTream.live_type, XTream.vod_type, XTream.series_type),
+        *,
+        workers: int = DEFAULT_WORKERS,
+        fetch_info: bool = True,
+        progress: Callable[[CrawlProgress], None] | None = None,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ) -> None:
+        self.client = client
+        self.out_dir = Path(out_dir)
+        self.stream_types = list(stream_types)
+        self.workers = workers
+        self.fetch_info = fetch_info
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    # Runs (or resumes) the crawl; `restart` discards the checkpoint and any info already fetched. Returns the
+    # number of titles whose info could not be fetched.
+    def run(self, restart: bool = False) -> int:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint = self._new_checkpoint() if restart else self.load_checkpoint()
+        if restart:
+            for stream_type in self.stream_types:
+                self._path(stream_type, "info.jsonl").unlink(missing_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="xtream-crawl") as executor:
+            self._crawl_listings(executor, checkpoint)
+            return self._crawl_info(executor) if self.fetch_info else 0
+
+    def load_checkpoint(self) -> dict[str, Any]:
+        path = self.out_dir / "checkpoint.json"
+        if not path.exists():
+            return self._new_checkpoint()
+        with path.open() as fp:
+            data = json.load(fp)
+        if data.get("version") != CHECKPOINT_VERSION:
+            logger.warning("Ignoring %s: unsupported checkpoint version %r", path, data.get("version"))
+            return self._new_checkpoint()
+        if (data.get("server"), data.get("username")) != (self.client.server, self.client.username):
+            msg = f"{path} belongs to {data.get('username')}@{data.get('server')}; use another directory or restart the crawl"
+            raise ValueError(msg)
+        return data
+
+    def save_checkpoint(self, checkpoint: dict[str, Any]) -> None:
+        path = self.out_dir / "checkpoint.json"
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w") as fp:
+            json.dump(checkpoint, fp)
+        tmp.replace(path)
+
+    # Stream objects of a completed listing.
+    def iter_streams(self, stream_type: str) -> Iterator[dict[str, Any]]:
+        with self._path(stream_type, "streams.jsonl").open("rb") as fp:
+            for line in fp:
+                yield json.loads(line)
+
+    def categories(self, stream_type: str) -> list[dict[str, Any]]:
+        with self._path(stream_type, "categories.json").open("rb") as fp:
+            data = json.load(fp)
+        return data if isinstance(data, list) else []
+
+    # (id, payload) for every info line of `stream_type`.
+    def iter_info(self, stream_type: str) -> Iterator[tuple[int, Any]]:
+        path = self._path(stream_type, "info.jsonl")
+        if not path.exists():
+            return
+        with path.open("rb") as fp:
+            for line in fp:
+                if line.endswith(b"\n"):
+                    data = json.loads(line)
+                    yield data["id"], data["info"]
+
+    # Writes the crawled catalogs and info payloads to a snapshot file (see CatalogStore / Snapshot).
+    def write_snapshot(self, path: str | Path) -> None:
+        catalogs = [Catalog.from_json(stream_type, self.categories(stream_type), self.iter_streams(stream_type)) for stream_type in self.stream_types]
+        info = {stream_type: {key: json.dumps(payload).encode() for key, payload in self.iter_info(stream_type)} for stream_type in self.stream_types}
+        Snapshot.write(path, catalogs, {stream_type: payloads for stream_type, payloads in info.items() if payloads})
+
+    def _crawl_listings(self, executor: ThreadPoolExecutor, checkpoint: dict[str, Any]) -> None:
+        pending = [stream_type for stream_type in self.stream_types if not checkpoint["listings"].get(stream_type)]
+        total, started = len(self.stream_types), time.monotonic()
+        self._report(CrawlProgress("listings", total - len(pending), total, 0, 0.0))
+        futures = {executor.submit(self._crawl_listing, stream_type): stream_type for stream_type in pending}
+        # Completed listings are checkpointed as they finish, so one that fails does not cost the others.
+        for done, future in enumerate(as_completed(futures), total - len(pending) + 1):
+            future.result()
+            checkpoint["listings"][futures[future]] = True
+            self.save_checkpoint(checkpoint)
+            self._report(CrawlProgress("listings", done, total, 0, time.monotonic() - started))
+
+    def _crawl_listing(self, stream_type: str) -> None:
+        categories = self.client.decode(self.client.categories(stream_type))
+        self._write_atomic(self._path(stream_type, "categories.json"), lambda fp: json.dump(categories, fp))
+        count = 0
+
+        def write_streams(fp: IO[str]) -> None:
+            nonlocal count
+            for data in self.client.iter_streams(stream_type):
+                fp.write(json.dumps(data))
+                fp.write("\n")
+                count += 1
+
+        self._write_atomic(self._path(stream_type, "streams.jsonl"), write_streams)
+        logger.info("%s listing: %d categories, %d streams", stream_type, len(categories) if isinstance(categories, list) else 0, count)
+
+    # Fetches the info of every title not in the info files yet, keeping at most a few requests per worker
+    # queued, and appends each payload as it arrives.
+    def _crawl_info(self, executor: ThreadPoolExecutor) -> int:
+        todo = [(stream_type, key) for stream_type in self.stream_types for key in self._pending_info(stream_type)]
+        total, failed, written = len(todo), 0, 0
+        started = last_report = time.monotonic()
+        if total:
+            self._report(CrawlProgress("info", 0, total, 0, 0.0))
+        with contextlib.ExitStack() as stack:
+            files = {stream_type: stack.enter_context(self._path(stream_type, "info.jsonl").open("a")) for stream_type in dict(todo)}
+            for (stream_type, key), payload in iter_completed(executor, self._fetch_info, todo, self.workers * 4):
+                if payload is None:
+                    failed += 1
+                    continue
+                files[stream_type].write(json.dumps({"id": key, "info": payload}) + "\n")
+                written += 1
+                if written % self.FLUSH_EVERY == 0:
+                    for fp in files.values():
+                        fp.flush()
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(CrawlProgress("info", written + failed, total, failed, now - started))
+        self._report(CrawlProgress("info", written + failed, total, failed, time.monotonic() - started))
+        return failed
+
+    # Ids listed for `stream_type` whose info is not on disk yet.
+    def _pending_info(self, stream_type: str) -> list[int]:
+        if self.client.info_fetcher(stream_type) is None:
+            return []
+        done = self._recover_info(stream_type)
+        field = "series_id" if XTream.stream_model(stream_type) is Series else "stream_id"
+        keys = dict.fromkeys(int(data[field]) for data in self.iter_streams(stream_type) if data.get(field) is not None)
+        return [key for key in keys if key not in done]
+
+    def _fetch_info(self, item: tuple[str, int]) -> Any | None:  # noqa: ANN401
+        stream_type, key = item
+        fetch = self.client.info_fetcher(stream_type)
+        if fetch is None:
+            return None
+        try:
+            return self.client.decode(fetch(str(key)))
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("%s info for %s failed: %s", stream_type, key, e)
+            return None
+
+    # Ids already in the info file of `stream_type`. A last line without its newline was cut short by an
+    # interrupted run and is truncated away.
+    def _recover_info(self, stream_type: str) -> set[int]:
+        path = self._path(stream_type, "info.jsonl")
+        done: set[int] = set()
+        if not path.exists():
+            return done
+        complete = 0
+        with path.open("rb") as fp:
+            for line in fp:
+                match = _INFO_ID.match(line)
+                if not line.endswith(b"\n") or match is None:
+                    break
+                done.add(int(match.group(1)))
+                complete += len(line)
+        if complete < path.stat().st_size:
+            logger.warning("Truncating %s after its last complete line", path)
+            with path.open("r+b") as fp:
+                fp.truncate(complete)
+        return done
+
+    def _report(self, progress: CrawlProgress) -> None:
+        if self.progress is not None:
+            self.progress(progress)
+
+    def _new_checkpoint(self) -> dict[str, Any]:
+        return {"version": CHECKPOINT_VERSION, "server": self.client.server, "username": self.client.username, "listings": {}}
+
+    def _path(self, stream_type: str, name: str) -> Path:
+        return self.out_dir / f"{stream_type.lower()}-{name}"
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Callable[[IO[str]], None]) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w") as fp:
+            write(fp)
+        tmp.replace(path)
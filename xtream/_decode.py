@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+from typing import TYPE_CHECKING, Any, Final, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Panels frequently omit the charset on their JSON responses, which makes `Response.json()` run charset detection
+# over the whole body before decoding it. The decoders below always start from the raw bytes instead: JSON is
+# UTF-8 by definition (RFC 8259) and every backend here decodes bytes directly.
+
+
+class JsonDecoder(Protocol):
+    name: str
+
+    def loads(self, data: bytes) -> Any: ...  # noqa: ANN401
+
+
+class StdlibDecoder:
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        return json.loads(data)
+
+
+class OrjsonDecoder:
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson  # noqa: PLC0415
+
+        self._loads: Callable[[bytes], Any] = orjson.loads
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        return self._loads(data)
+
+
+# msgspec.DecodeError does not derive from ValueError; it is re-raised as one so that every backend fails the
+# way json.loads and orjson.loads do and the per-title error handlers catch it.
+class MsgspecDecoder:
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec  # noqa: PLC0415
+
+        self._loads: Callable[[bytes], Any] = msgspec.json.Decoder().decode
+        self._error: type[Exception] = msgspec.DecodeError
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        try:
+            return self._loads(data)
+        except self._error as e:
+            raise ValueError(str(e)) from e
+
+
+DECODERS: Final[dict[str, type[JsonDecoder]]] = {
+    StdlibDecoder.name: StdlibDecoder,
+    OrjsonDecoder.name: OrjsonDecoder,
+    MsgspecDecoder.name: MsgspecDecoder,
+}
+
+# Preference order for "auto", which has to be asked for: the optional backends first, whichever of them happens
+# to be installed. The default everywhere is the stdlib, so installing orjson for something else does not change
+# how this client decodes.
+AUTO_ORDER: Final[tuple[str, ...]] = (OrjsonDecoder.name, MsgspecDecoder.name, StdlibDecoder.name)
+
+
+def get_decoder(name: str = StdlibDecoder.name) -> JsonDecoder:
+    if name == "auto":
+        name = next(n for n in AUTO_ORDER if n == StdlibDecoder.name or importlib.util.find_spec(n) is not None)
+    try:
+        return DECODERS[name]()
+    except KeyError:
+        msg = f"Unknown JSON decoder {name!r}, expected one of {', '.join(['auto', *DECODERS])}"
+        raise ValueError(msg) from None
+    except ImportError as e:
+        msg = f"JSON decoder {name!r} is not installed (pip install {name})"
+        raise ValueError(msg) from e
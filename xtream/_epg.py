@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Self
+
+from xtream._models import EpgEntry
+from xtream._xmltv import Channel, Programme
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from xtream._xmltv import XMLTVRecord
+
+EpgItem = Programme | EpgEntry
+
+
+def item_times(item: EpgItem) -> tuple[int, int] | None:
+    if isinstance(item, EpgEntry):
+        return item.start_timestamp, item.stop_timestamp
+    if item.start is None or item.stop is None:
+        return None
+    return int(item.start.timestamp()), int(item.stop.timestamp())
+
+
+def item_channel(item: EpgItem) -> str:
+    return item.channel_id if isinstance(item, EpgEntry) else item.channel
+
+
+# The programmes of one channel ordered by start time. Start/stop live in packed int64 columns that are
+# binary-searched; `longest` bounds how far back a programme overlapping a given instant can start, which keeps
+# window queries correct even when a panel sends overlapping entries.
+class ChannelGuide:
+    __slots__ = ("items", "longest", "starts", "stops")
+
+    def __init__(self) -> None:
+        self.starts: array[int] = array("q")
+        self.stops: array[int] = array("q")
+        self.items: list[EpgItem] = []
+        self.longest = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    # Merges `entries` (start, stop, item); an entry replaces whatever was stored with the same start time.
+    # Appending strictly later programmes, the common case when a guide is refreshed, skips the re-sort.
+    def merge(self, entries: list[tuple[int, int, EpgItem]]) -> None:
+        entries.sort(key=lambda e: e[0])
+        unique: Iterable[tuple[int, int, EpgItem]]
+        if not self.starts or entries[0][0] > self.starts[-1]:
+            unique = {e[0]: e for e in entries}.values()
+        else:
+            merged = {start: (start, stop, item) for start, stop, item in zip(self.starts, self.stops, self.items, strict=True)}
+            merged.update((e[0], e) for e in entries)
+            unique = sorted(merged.values(), key=lambda e: e[0])
+            self.starts, self.stops, self.items = array("q"), array("q"), []
+        for start, stop, item in unique:
+            self.starts.append(start)
+            self.stops.append(stop)
+            self.items.append(item)
+            self.longest = max(self.longest, stop - start)
+
+    def now(self, at: int) -> int:
+        i = bisect_right(self.starts, at) - 1
+        while i >= 0 and self.starts[i] >= at - self.longest:
+            if self.stops[i] > at:
+                return i
+            i -= 1
+        return -1
+
+    def next(self, at: int) -> int:
+        i = bisect_right(self.starts, at)
+        return i if i < len(self.starts) else -1
+
+    # Indexes of the programmes overlapping [start, stop).
+    def window(self, start: int, stop: int) -> Iterator[int]:
+        lo = bisect_left(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, stop)
+        return (i for i in range(lo, hi) if self.stops[i] > start)
+
+    def prune(self, before: int) -> int:
+        cut = bisect_left(self.starts, before - self.longest)
+        keep = [i for i in range(cut, len(self.items)) if self.stops[i] > before]
+        removed = len(self.items) - len(keep)
+        if removed:
+            self.starts = array("q", (self.starts[i] for i in keep))
+            self.stops = array("q", (self.stops[i] for i in keep))
+            self.items = [self.items[i] for i in keep]
+        return removed
+
+
+# Programme guide indexed by channel and time, fed from iter_epg() (XMLTV Programme records) or from decoded
+# get_short_epg / get_simple_data_table listings (EpgEntry). Channels are keyed by their EPG id, i.e. a live
+# stream's epg_channel_id. Every query is a binary search per channel; new data can be merged in at any time.
+class EpgIndex:
+    def __init__(self) -> None:
+        self.channels: dict[str, Channel] = {}
+        self._guides: dict[str, ChannelGuide] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[XMLTVRecord | EpgEntry]) -> Self:
+        index = cls()
+        index.extend(records)
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(guide) for guide in self._guides.values())
+
+    def __contains__(self, channel: object) -> bool:
+        return channel in self._guides
+
+    def channel_ids(self) -> list[str]:
+        return list(self._guides)
+
+    # Merges `records` into the index; programmes without a usable start/stop are skipped and <channel>
+    # records are kept in `channels`. Returns the number of programmes merged.
+    def extend(self, records: Iterable[XMLTVRecord | EpgEntry]) -> int:
+        pending: dict[str, list[tuple[int, int, EpgItem]]] = {}
+        count = 0
+        for record in records:
+            if isinstance(record, Channel):
+                self.channels[record.id] = record
+                continue
+            times = item_times(record)
+            if times is None:
+                continue
+            pending.setdefault(item_channel(record), []).append((times[0], times[1], record))
+            count += 1
+        for channel, entries in pending.items():
+            guide = self._guides.get(channel)
+            if guide is None:
+                guide = self._guides[channel] = ChannelGuide()
+            guide.merge(entries)
+        return count
+
+    def now(self, channel: str, at: float | None = None) -> EpgItem | None:
+        guide = self._guides.get(channel)
+        if guide is None:
+            return None
+        i = guide.now(self._at(at))
+        return guide.items[i] if i >= 0 else None
+
+    def next(self, channel: str, at: float | None = None) -> EpgItem | None:
+        guide = self._guides.get(channel)
+        if guide is None:
+            return None
+        i = guide.next(self._at(at))
+        return guide.items[i] if i >= 0 else None
+
+    # Now and next for every channel in `channels` (all indexed channels by default).
+    def now_next(self, channels: Iterable[str] | None = None, at: float | None = None) -> dict[str, tuple[EpgItem | None, EpgItem | None]]:
+        moment = self._at(at)
+        result: dict[str, tuple[EpgItem | None, EpgItem | None]] = {}
+        for channel in self._guides if channels is None else channels:
+            guide = self._guides.get(channel)
+            if guide is None:
+                continue
+            i, j = guide.now(moment), guide.next(moment)
+            result[channel] = (guide.items[i] if i >= 0 else None, guide.items[j] if j >= 0 else None)
+        return result
+
+    # Programmes overlapping [start, stop), per channel, in start order. Channels with nothing airing are omitted.
+    def window(self, start: float, stop: float, channels: Iterable[str] | None = None) -> dict[str, list[EpgItem]]:
+        lo, hi = int(start), int(stop)
+        result: dict[str, list[EpgItem]] = {}
+        for channel in self._guides if channels is None else channels:
+            guide = self._guides.get(channel)
+            if guide is None:
+                continue
+            items = [guide.items[i] for i in guide.window(lo, hi)]
+            if items:
+                result[channel] = items
+        return result
+
+    # Drops programmes that ended before `before` (now by default); returns how many were removed.
+    def prune(self, before: float | None = None) -> int:
+        moment = self._at(before)
+        removed = 0
+        for channel, guide in list(self._guides.items()):
+            removed += guide.prune(moment)
+            if not guide:
+                del self._guides[channel]
+        return removed
+
+    @staticmethod
+    def _at(at: float | None) -> int:
+        return int(time.time() if at is None else at)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import csv
+import logging
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, Any, Final, Self
+
+import requests
+
+from xtream._fanout import iter_completed
+from xtream._models import to_int
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from xtream._xtream import XTream
+
+logger = logging.getLogger(__name__)
+
+EPISODE_COLUMNS: Final[tuple[str, ...]] = (
+    "series_id",
+    "season",
+    "episode_num",
+    "id",
+    "container_extension",
+    "duration_secs",
+    "added",
+    "video_codec",
+)
+DEFAULT_WORKERS: Final[int] = 16
+
+
+# Episode length in seconds: info.duration_secs, or info.duration ("HH:MM:SS") when a panel only sends that.
+def episode_duration(info: Mapping[str, Any]) -> int:
+    seconds = to_int(info.get("duration_secs"), -1)
+    if seconds >= 0:
+        return seconds
+    total = 0
+    for part in str(info.get("duration") or "").split(":"):
+        total = total * 60 + to_int(part)
+    return total
+
+
+# (season, episode) pairs of a get_series_info payload. `episodes` is {"<season>": [episode, ...]}, or on some
+# panels a list of per-season lists, taken as seasons 1, 2, ... The season is the one the grouping says; each
+# episode's own `season` field, when present, takes precedence over it in EpisodeTable.
+def iter_episodes(payload: Mapping[str, Any]) -> Iterator[tuple[int, Mapping[str, Any]]]:
+    episodes = payload.get("episodes") or {}
+    seasons = episodes.items() if isinstance(episodes, dict) else enumerate(episodes, 1) if isinstance(episodes, list) else ()
+    for season, items in seasons:
+        if isinstance(items, list):
+            number = to_int(season)
+            yield from ((number, episode) for episode in items if isinstance(episode, dict))
+
+
+# Every episode of many series, one row per episode, in packed columns: ids, numbers, durations and timestamps
+# are arrays, and the container extensions and video codecs (a handful of distinct values) are stored as int32
+# references into a short list. The rows of a series are contiguous, so per-series aggregates are sums and
+# lengths over array slices rather than Python loops over episode dicts.
+class EpisodeTable:
+    __slots__ = (
+        "_codec_index",
+        "_extension_index",
+        "_spans",
+        "added",
+        "codec_refs",
+        "codecs",
+        "durations",
+        "episode_nums",
+        "extension_refs",
+        "extensions",
+        "failed",
+        "ids",
+        "seasons",
+        "series_ids",
+    )
+
+    def __init__(self) -> None:
+        self.series_ids: array[int] = array("q")
+        self.seasons: array[int] = array("l")
+        self.episode_nums: array[int] = array("l")
+        self.ids: array[int] = array("q")
+        self.extension_refs: array[int] = array("l")
+        self.durations: array[int] = array("q")
+        self.added: array[int] = array("q")
+        self.codec_refs: array[int] = array("l")
+        self.extensions: list[str] = []
+        self.codecs: list[str] = []
+        self._extension_index: dict[str, int] = {}
+        self._codec_index: dict[str, int] = {}
+        # series_id -> (first row, end row)
+        self._spans: dict[int, tuple[int, int]] = {}
+        # Series whose get_series_info failed in fetch(); the table has no rows for them.
+        self.failed: list[int] = []
+
+    # Fetches get_series_info for every id in `series_ids` concurrently and flattens the episodes. Series that
+    # could not be fetched are listed in `failed`, so an empty list means the table is complete.
+    @classmethod
+    def fetch(cls, client: XTream, series_ids: Iterable[int], workers: int = DEFAULT_WORKERS) -> Self:
+        table = cls()
+        for series_id, payload in iter_series_info(client, series_ids, workers):
+            if payload is None:
+                table.failed.append(series_id)
+            else:
+                table.add_series(series_id, payload)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, series_id: object) -> bool:
+        return series_id in self._spans
+
+    def series_count(self) -> int:
+        return len(self._spans)
+
+    # Flattens the episodes of a decoded get_series_info payload, replacing rows already held for the series.
+    # Returns the number of episodes added.
+    def add_series(self, series_id: int, payload: Mapping[str, Any]) -> int:
+        if series_id in self._spans:
+            self.remove_series(series_id)
+        start = len(self.ids)
+        for season, episode in iter_episodes(payload):
+            info = episode.get("info")
+            info = info if isinstance(info, dict) else {}
+            video = info.get("video")
+            self.series_ids.append(series_id)
+            self.seasons.append(to_int(episode.get("season"), season))
+            self.episode_nums.append(to_int(episode.get("episode_num")))
+            self.ids.append(to_int(episode.get("id")))
+            self.extension_refs.append(self._ref(self.extensions, self._extension_index, episode.get("container_extension")))
+            self.durations.append(episode_duration(info))
+            self.added.append(to_int(episode.get("added")))
+            self.codec_refs.append(self._ref(self.codecs, self._codec_index, video.get("codec_name") if isinstance(video, dict) else None))
+        self._spans[series_id] = (start, len(self.ids))
+        return len(self.ids) - start
+
+    # Deletes the rows of the series from every column and shifts the spans after it: O(rows) per call. To drop
+    # many series, building a new table from the remaining payloads is cheaper.
+    def remove_series(self, series_id: int) -> bool:
+        span = self._spans.pop(series_id, None)
+        if span is None:
+            return False
+        start, stop = span
+        for column in self._columns():
+            del column[start:stop]
+        removed = stop - start
+        self._spans = {key: (a - removed, b - removed) if a >= stop else (a, b) for key, (a, b) in self._spans.items()}
+        return True
+
+    # Episodes per series.
+    def counts(self) -> dict[int, int]:
+        return {series_id: stop - start for series_id, (start, stop) in self._spans.items()}
+
+    # Distinct seasons per series.
+    def season_counts(self) -> dict[int, int]:
+        return {series_id: len(set(self.seasons[start:stop])) for series_id, (start, stop) in self._spans.items()}
+
+    # Summed episode durations in seconds, per series.
+    def runtimes(self) -> dict[int, int]:
+        return {series_id: sum(self.durations[start:stop]) for series_id, (start, stop) in self._spans.items()}
+
+    def total_runtime(self) -> int:
+        return sum(self.durations)
+
+    # Episodes per video codec ("" where the panel did not say).
+    def codec_mix(self) -> dict[str, int]:
+        return {self.codecs[ref]: count for ref, count in Counter(self.codec_refs).most_common()}
+
+    def extension_mix(self) -> dict[str, int]:
+        return {self.extensions[ref]: count for ref, count in Counter(self.extension_refs).most_common()}
+
+    # Rows in EPISODE_COLUMNS order, for all series or only `series_id`.
+    def rows(self, series_id: int | None = None) -> Iterator[tuple[int, int, int, int, str, int, int, str]]:
+        start, stop = (0, len(self)) if series_id is None else self._spans.get(series_id, (0, 0))
+        return zip(
+            self.series_ids[start:stop],
+            self.seasons[start:stop],
+            self.episode_nums[start:stop],
+            self.ids[start:stop],
+            map(self.extensions.__getitem__, self.extension_refs[start:stop]),
+            self.durations[start:stop],
+            self.added[start:stop],
+            map(self.codecs.__getitem__, self.codec_refs[start:stop]),
+            strict=True,
+        )
+
+    # Streams the table as CSV to a text file; rows are produced one at a time.
+    def write_csv(self, out: IO[str], header: bool = True) -> int:
+        writer = csv.writer(out)
+        if header:
+            writer.writerow(EPISODE_COLUMNS)
+        writer.writerows(self.rows())
+        return len(self)
+
+    def _columns(self) -> tuple[array[int], ...]:
+        return (self.series_ids, self.seasons, self.episode_nums, self.ids, self.extension_refs, self.durations, self.added, self.codec_refs)
+
+    @staticmethod
+    def _ref(values: list[str], index: dict[str, int], value: object) -> int:
+        key = value if isinstance(value, str) else "" if value is None else str(value)
+        ref = index.get(key)
+        if ref is None:
+            ref = index[key] = len(values)
+            values.append(key)
+        return ref
+
+
+# Decoded get_series_info payloads for `series_ids`, yielded as they complete with at most a few requests per
+# worker queued. Series whose request or decoding failed are logged and yielded with None.
+def iter_series_info(client: XTream, series_ids: Iterable[int], workers: int = DEFAULT_WORKERS) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="xtream-series") as executor:
+        yield from iter_completed(executor, lambda series_id: _series_info(client, series_id), series_ids, workers * 4)
+
+
+def _series_info(client: XTream, series_id: int) -> dict[str, Any] | None:
+    try:
+        payload = client.decode(client.series_info_by_id(str(series_id)))
+    except (requests.RequestException, ValueError) as e:
+        logger.warning("Series info for %s failed: %s", series_id, e)
+        return None
+    if not isinstance(payload, dict):
+        logger.warning("Series info for %s is not an object", series_id)
+        return None
+    return payload
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Executor, Future
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# Calls `fn` on every item on `executor` and yields (item, result) pairs in completion order. At most `limit`
+# calls are submitted at a time, so a long input is consumed as the calls finish instead of being queued up
+# front, and closing the iterator early cancels the calls that have not started yet.
+def iter_completed(executor: Executor, fn: Callable[[T], R], items: Iterable[T], limit: int) -> Iterator[tuple[T, R]]:
+    limit = max(limit, 1)
+    queue = iter(items)
+    running: dict[Future[R], T] = {}
+    try:
+        while True:
+            for item in itertools.islice(queue, limit - len(running)):
+                running[executor.submit(fn, item)] = item
+            if not running:
+                return
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield running.pop(future), future.result()
+    finally:
+        for future in running:
+            future.cancel()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import dataclasses
+import http.client
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+from urllib.parse import urljoin, urlsplit
+
+from xtream._fanout import iter_completed
+from xtream._models import LiveStream, to_int
+from xtream._playlist import choose_live_extension
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from xtream._playlist import StreamUrlBuilder
+    from xtream._xtream import XTream
+
+logger = logging.getLogger(__name__)
+
+HEALTH_VERSION: Final[int] = 1
+REDIRECT_STATUSES: Final[frozenset[int]] = frozenset({301, 302, 303, 307, 308})
+# Every MPEG-TS packet is 188 bytes long and starts with this byte.
+TS_SYNC_BYTE: Final[int] = 0x47
+TS_PACKET_SIZE: Final[int] = 188
+# Shortest MPEG-TS sample accepted: enough for two whole packets wherever the body starts.
+MIN_TS_BYTES: Final[int] = 2 * TS_PACKET_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeResult:
+    stream_id: int
+    url: str
+    ok: bool
+    status: int | None = None
+    # Seconds to open the (last, after redirects) TCP/TLS connection, from sending the request to the response
+    # headers, and bytes/second over the sampled body. None where the probe did not get that far.
+    connect_time: float | None = None
+    ttfb: float | None = None
+    throughput: float | None = None
+    bytes_read: int = 0
+    hls: bool = False
+    error: str | None = None
+    checked_at: float = 0.0
+
+    # 0 for a failed probe; otherwise 0.5, plus up to 0.5 for a fast response and a quick initial transfer.
+    # HLS manifests are too small for a meaningful throughput, so only their latency counts.
+    @property
+    def score(self) -> float:
+        if not self.ok:
+            return 0.0
+        latency = 1.0 / (1.0 + ((self.connect_time or 0.0) + (self.ttfb or 0.0)) / StreamProber.LATENCY_SCALE)
+        if self.hls or self.throughput is None:
+            return 0.5 + 0.5 * latency
+        return 0.5 + 0.25 * latency + 0.25 * min(self.throughput / StreamProber.GOOD_THROUGHPUT, 1.0)
+
+
+# What is known about one channel across runs. `score` is an exponentially weighted average of the probe
+# scores, so one bad probe lowers a reliable channel without writing it off.
+@dataclass(slots=True)
+class ChannelHealth:
+    stream_id: int
+    score: float = 0.0
+    probes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_checked: float = 0.0
+    last_ok: float | None = None
+    connect_time: float | None = None
+    ttfb: float | None = None
+    throughput: float | None = None
+    error: str | None = None
+
+    def update(self, result: ProbeResult, weight: float) -> None:
+        self.score = result.score if self.probes == 0 else weight * result.score + (1.0 - weight) * self.score
+        self.probes += 1
+        self.last_checked = result.checked_at
+        self.error = result.error
+        if result.ok:
+            self.consecutive_failures = 0
+            self.last_ok = result.checked_at
+            self.connect_time, self.ttfb, self.throughput = result.connect_time, result.ttfb, result.throughput
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+
+# Per-channel health kept in a JSON file between runs.
+class HealthStore:
+    DEFAULT_WEIGHT: Final[float] = 0.5
+
+    def __init__(self, path: str | Path | None = None, weight: float = DEFAULT_WEIGHT) -> None:
+        self.path = Path(path) if path is not None else None
+        self.weight = weight
+        self.channels: dict[int, ChannelHealth] = {}
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def __contains__(self, stream_id: object) -> bool:
+        return stream_id in self.channels
+
+    def get(self, stream_id: int) -> ChannelHealth | None:
+        return self.channels.get(stream_id)
+
+    def update(self, result: ProbeResult) -> ChannelHealth:
+        health = self.channels.get(result.stream_id)
+        if health is None:
+            health = self.channels[result.stream_id] = ChannelHealth(result.stream_id)
+        health.update(result, self.weight)
+        return health
+
+    def extend(self, results: Iterable[ProbeResult]) -> int:
+        count = 0
+        for result in results:
+            self.update(result)
+            count += 1
+        return count
+
+    # Channels from best to worst score.
+    def ranked(self) -> list[ChannelHealth]:
+        return sorted(self.channels.values(), key=lambda h: h.score, reverse=True)
+
+    # Channels that failed their last `failures` probes in a row.
+    def dead(self, failures: int = 1) -> list[ChannelHealth]:
+        return [health for health in self.channels.values() if health.consecutive_failures >= failures]
+
+    def load(self) -> None:
+        path = self._require_path()
+        with path.open() as fp:
+            data = json.load(fp)
+        if data.get("version") != HEALTH_VERSION:
+            logger.warning("Ignoring %s: unsupported health file version %r", path, data.get("version"))
+            return
+        self.channels = {int(key): ChannelHealth(**value) for key, value in data["channels"].items()}
+
+    def save(self) -> None:
+        path = self._require_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w") as fp:
+            json.dump({"version": HEALTH_VERSION, "channels": {key: dataclasses.asdict(value) for key, value in self.channels.items()}}, fp)
+        tmp.replace(path)
+
+    def _require_path(self) -> Path:
+        if self.path is None:
+            msg = "HealthStore was created without a path"
+            raise ValueError(msg)
+        return self.path
+
+
+# Checks many live streams concurrently. Every probe opens its own connection (http.client rather than the
+# pooled, retrying session of XTream), so connect time and time to first byte are measured per stream, follows
+# redirects to the panel's edge servers, and reads at most `max_bytes` during at most `sample_time` seconds: the
+# first MPEG-TS packets, or the HLS manifest. Concurrency is capped by the account's free connections
+# (max_connections - active_cons), as every probe counts as a viewer while it runs; with none free, probing
+# raises LookupError instead of pushing the account over its limit.
+class StreamProber:
+    DEFAULT_CONNECT_TIMEOUT: Final[float] = 3.0
+    DEFAULT_READ_TIMEOUT: Final[float] = 5.0
+    DEFAULT_SAMPLE_TIME: Final[float] = 2.0
+    DEFAULT_MAX_BYTES: Final[int] = 256 * 1024
+    MAX_REDIRECTS: Final[int] = 5
+    CHUNK_SIZE: Final[int] = 16 * 1024
+    # Scoring: latency (connect + TTFB) at which half of the latency credit is lost, and the initial
+    # throughput (bytes/second, about 4 Mbit/s) that earns all of the throughput credit.
+    LATENCY_SCALE: Final[float] = 1.0
+    GOOD_THROUGHPUT: Final[float] = 500_000.0
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: XTream,
+        *,
+        connections: int | None = None,
+        live_extension: str | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        sample_time: float = DEFAULT_SAMPLE_TIME,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.client = client
+        self.connections = connections
+        self.live_extension = live_extension
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.sample_time = sample_time
+        self.max_bytes = max_bytes
+        self._urls: StreamUrlBuilder | None = None
+
+    # Probes `streams` (live records or stream ids) and yields the results as they complete. The account is
+    # authenticated once first, for allowed_output_formats and the connection budget.
+    def probe(self, streams: Iterable[LiveStream | int]) -> Iterator[ProbeResult]:
+        connections, urls = self._prepare()
+        queue = (stream.stream_id if isinstance(stream, LiveStream) else stream for stream in streams)
+        logger.debug("Probing live streams with %d connections", connections)
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="xtream-probe") as executor:
+            for _, result in iter_completed(executor, lambda stream_id: self.probe_url(stream_id, urls.live(stream_id)), queue, connections):
+                yield result
+
+    # Probes every live stream of the account.
+    def probe_all(self) -> Iterator[ProbeResult]:
+        return self.probe(record for record in self.client.iter_stream_records(self.client.live_type) if isinstance(record, LiveStream))
+
+    def probe_url(self, stream_id: int, url: str) -> ProbeResult:
+        checked_at = time.time()
+        try:
+            return self._probe(stream_id, url, checked_at)
+        except (OSError, http.client.HTTPException) as e:
+            return ProbeResult(stream_id, url, ok=False, error=str(e) or type(e).__name__, checked_at=checked_at)
+
+    def _probe(self, stream_id: int, url: str, checked_at: float) -> ProbeResult:
+        target = url
+        for _ in range(self.MAX_REDIRECTS + 1):
+            parts = urlsplit(target)
+            connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(parts.netloc, timeout=self.connect_timeout)
+            try:
+                started = time.perf_counter()
+                connection.connect()
+                connected = time.perf_counter()
+                if connection.sock is not None:
+                    connection.sock.settimeout(self.read_timeout)
+                connection.request("GET", parts.path + (f"?{parts.query}" if parts.query else ""), headers={"User-Agent": "xtream-probe"})
+                response = connection.getresponse()
+                headers_at = time.perf_counter()
+                location = response.getheader("Location")
+                if response.status in REDIRECT_STATUSES and location:
+                    target = urljoin(target, location)
+                    continue
+                if response.status != http.client.OK:
+                    return ProbeResult(
+                        stream_id,
+                        url,
+                        ok=False,
+                        status=response.status,
+                        connect_time=connected - started,
+                        ttfb=headers_at - connected,
+                        error=f"HTTP {response.status} {response.reason}",
+                        checked_at=checked_at,
+                    )
+                body, elapsed = self._sample(response)
+            finally:
+                connection.close()
+            # Judged by what was asked for, not by the reply, so an error page is not mistaken for a stream.
+            hls = urlsplit(url).path.endswith(".m3u8") or "mpegurl" in (response.getheader("Content-Type") or "").lower()
+            error = self._check_body(body, hls)
+            return ProbeResult(
+                stream_id,
+                url,
+                ok=error is None,
+                status=response.status,
+                connect_time=connected - started,
+                ttfb=headers_at - connected,
+                throughput=len(body) / elapsed if elapsed > 0 else None,
+                bytes_read=len(body),
+                hls=hls,
+                error=error,
+                checked_at=checked_at,
+            )
+        msg = f"more than {self.MAX_REDIRECTS} redirects"
+        raise http.client.HTTPException(msg)
+
+    # Reads the start of the body; returns it with the seconds it took.
+    def _sample(self, response: http.client.HTTPResponse) -> tuple[bytes, float]:
+        chunks: list[bytes] = []
+        size = 0
+        started = time.perf_counter()
+        deadline = started + self.sample_time
+        while size < self.max_bytes and time.perf_counter() < deadline:
+            chunk = response.read1(min(self.CHUNK_SIZE, self.max_bytes - size))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks), time.perf_counter() - started
+
+    # Why the body is not a playable stream, or None when it looks like one.
+    @staticmethod
+    def _check_body(body: bytes, hls: bool) -> str | None:
+        if not body:
+            return "empty response"
+        if hls:
+            lines = body.lstrip().splitlines()
+            if not lines or lines[0].strip() != b"#EXTM3U":
+                return "response is not an HLS manifest"
+            # A manifest must list at least one segment or variant playlist.
+            return None if any(line.strip() and not line.startswith(b"#") for line in lines[1:]) else "HLS manifest without entries"
+        if len(body) < MIN_TS_BYTES:
+            return f"response is too short for an MPEG-TS stream ({len(body)} bytes)"
+        # The body may start mid-packet: look for an offset where every packet of the sample starts with a sync
+        # byte, which means at least two of them exactly one packet apart.
+        for i in range(TS_PACKET_SIZE):
+            if body[i] == TS_SYNC_BYTE:
+                starts = body[i::TS_PACKET_SIZE]
+                if starts.count(TS_SYNC_BYTE) == len(starts):
+                    return None
+        return "response is not an MPEG-TS stream"
+
+    # The live URL builder and the number of probes to run at once.
+    def _prepare(self) -> tuple[int, StreamUrlBuilder]:
+        if self._urls is not None and self.connections is not None:
+            return self._check_connections(self.connections), self._urls
+        user_info = self.client.decode(self.client.authenticate()).get("user_info") or {}
+        if self._urls is None:
+            extension = self.live_extension or choose_live_extension(user_info.get("allowed_output_formats") or ())
+            self._urls = self.client.url_builder(extension)
+        connections = self.connections
+        if connections is None:
+            connections = to_int(user_info.get("max_connections"), 1) - to_int(user_info.get("active_cons"))
+        return self._check_connections(connections), self._urls
+
+    @staticmethod
+    def _check_connections(connections: int) -> int:
+        if connections < 1:
+            msg = "no free connection on the account to probe with"
+            raise LookupError(msg)
+        return connections
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+WHITESPACE: Final[str] = " \t\n\r"
+SEPARATORS: Final[str] = ",]"
+# Positions are advanced with these instead of slicing the buffer, so the cost per element does not grow with
+# the chunk size.
+_SKIP_WHITESPACE: Final[re.Pattern[str]] = re.compile(f"[{WHITESPACE}]*")
+_SKIP_SEPARATOR: Final[re.Pattern[str]] = re.compile(f"[{WHITESPACE},]*")
+
+_decoder = json.JSONDecoder()
+
+
+# Decodes a top-level JSON array one element at a time from a stream of byte chunks. Only the element
+# currently being decoded (plus at most one chunk of look-ahead) is held in memory, so a listing can be
+# filtered or written out while the rest of it is still downloading.
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    return _ArrayReader(chunks).iter_values()
+
+
+class _ArrayReader:
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._text = _iter_text(chunks)
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def iter_values(self) -> Iterator[Any]:
+        head = self._peek(_SKIP_WHITESPACE)
+        if head is None:
+            return
+        if head != "[":
+            # Panels answer some failures (e.g. bad credentials) with an object instead of a list.
+            yield from self._decode_document()
+            return
+
+        self._pos += 1
+        while True:
+            c = self._peek(_SKIP_SEPARATOR)
+            if c is None:
+                msg = "Unterminated JSON array"
+                raise ValueError(msg)
+            if c == "]":
+                return
+            yield self._decode_value()
+
+    def _decode_document(self) -> list[Any]:
+        while self._fill():
+            pass
+        value = json.loads(self._buf[self._pos :])
+        if isinstance(value, list):
+            return value
+        msg = f"Expected a JSON array, got {type(value).__name__}"
+        raise ValueError(msg)
+
+    def _decode_value(self) -> Any:  # noqa: ANN401
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value is only complete once the separator after it is visible; otherwise a number such as
+            # "3." or "12" may still continue in the next chunk.
+            after = _skip(_SKIP_WHITESPACE, self._buf, end)
+            if (after == len(self._buf) or self._buf[after] not in SEPARATORS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _peek(self, skip: re.Pattern[str]) -> str | None:
+        while True:
+            pos = self._pos = _skip(skip, self._buf, self._pos)
+            if pos < len(self._buf):
+                return self._buf[pos]
+            if not self._fill():
+                return None
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = next(self._text, None)
+        if chunk is None:
+            self._eof = True
+            return False
+        # Drop what has already been consumed before growing the buffer, keeping appends linear.
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+
+def _skip(pattern: re.Pattern[str], buf: str, pos: int) -> int:
+    match = pattern.match(buf, pos)
+    return match.end() if match is not None else pos
+
+
+def _iter_text(chunks: Iterable[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    for chunk in chunks:
+        if chunk:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
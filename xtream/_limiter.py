@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import contextlib
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Final
+
+import requests
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "slow down" rather than "this request is wrong".
+THROTTLE_STATUSES: Final[frozenset[int]] = frozenset({HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE})
+RETRY_STATUSES: Final[frozenset[int]] = THROTTLE_STATUSES | {HTTPStatus.BAD_GATEWAY, HTTPStatus.GATEWAY_TIMEOUT}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Reserves one token and returns how long the caller has to wait before it may proceed.
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+# Additive-increase / multiplicative-decrease concurrency window: every success widens it by ~1 per window's worth
+# of requests, every throttle signal halves it (at most once per `cooldown`, since a burst of in-flight requests
+# usually gets throttled together).
+class AimdWindow:
+    def __init__(self, initial: float, minimum: float = 1.0, maximum: float = 64.0, cooldown: float = 1.0) -> None:
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+                    logger.debug("Throttled, concurrency window now %.1f", self.limit)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    CLOSED: Final[str] = "closed"
+    OPEN: Final[str] = "open"
+    HALF_OPEN: Final[str] = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    # While open every call fails fast; after reset_timeout a single probe is let through to test the host.
+    def before_call(self, host: str) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        msg = f"Circuit open for {host}"
+        raise CircuitOpenError(msg)
+
+    # `success` None records nothing about the host (the call was throttled, or failed for a reason of its own)
+    # but still ends a half-open probe.
+    def record(self, success: bool | None) -> None:
+        with self._lock:
+            self._probing = False
+            if success is None:
+                return
+            if success:
+                self._failures = 0
+                self.state = self.CLOSED
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+@dataclass(slots=True)
+class _Host:
+    window: AimdWindow
+    breaker: CircuitBreaker
+    bucket: TokenBucket | None
+    paused_until: float = 0.0
+
+
+class Slot:
+    __slots__ = ("retry_after", "status_code")
+
+    def __init__(self) -> None:
+        self.status_code: int | None = None
+        self.retry_after: float | None = None
+
+    def observe(self, response: requests.Response) -> None:
+        self.status_code = response.status_code
+        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+
+# Per-host admission control for every request a client sends: a circuit breaker, an optional token bucket
+# (requests/second), an AIMD concurrency window and Retry-After pauses. Throttled or failed requests are retried
+# with jittered exponential backoff up to `max_retries` times by the client. Hosts are tracked independently, so a
+# single limiter can be shared by every client talking to the same panel.
+class AdaptiveLimiter:
+    def __init__(  # noqa: PLR0913
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        *,
+        initial_concurrency: float = 4.0,
+        max_concurrency: float = 64.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: dict[str, _Host] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()  # noqa: S311 - jitter only
+
+    def concurrency(self, host: str) -> float:
+        return self._host(host).window.limit
+
+    @contextlib.contextmanager
+    def slot(self, host: str) -> Iterator[Slot]:
+        state = self._host(host)
+        state.breaker.before_call(host)
+        with self._lock:
+            delay = max(state.paused_until - time.monotonic(), 0.0)
+        if state.bucket is not None:
+            delay = max(delay, state.bucket.reserve())
+        if delay > 0:
+            time.sleep(delay)
+        state.window.acquire()
+        slot = Slot()
+        # Throttle statuses (429, and the 503 some panels send instead) only narrow the window: being told to slow
+        # down says nothing about the host being down, so they never count towards opening the circuit.
+        success: bool | None = None
+        try:
+            yield slot
+            if slot.status_code not in THROTTLE_STATUSES:
+                success = (slot.status_code or 0) < HTTPStatus.INTERNAL_SERVER_ERROR
+        except requests.RequestException:
+            success = False
+            raise
+        finally:
+            throttled = slot.status_code in THROTTLE_STATUSES
+            state.window.release(throttled=throttled)
+            state.breaker.record(success)
+            if slot.retry_after is not None and throttled:
+                with self._lock:
+                    state.paused_until = max(state.paused_until, time.monotonic() + slot.retry_after)
+
+    # How long to wait before retrying `response` (None when it should not be retried): full-jitter exponential
+    # backoff, never shorter than what the server asked for in Retry-After.
+    def retry_delay(self, response: requests.Response, attempt: int) -> float | None:
+        if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+        return self.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        delay = self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _Host(
+                    window=AimdWindow(self.initial_concurrency, maximum=self.max_concurrency),
+                    breaker=CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                    bucket=TokenBucket(self.rate, self.burst) if self.rate else None,
+                )
+            return state
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
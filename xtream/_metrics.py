@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+
+@dataclass(frozen=True, slots=True)
+class RequestMetrics:
+    # `action` is the player_api action (get_vod_info, get_short_epg, ...) or the endpoint name
+    # (player_api.php for authentication, xmltv.php for the full guide).
+    action: str
+    status_code: int
+    ttfb: float
+    latency: float
+    size: int
+    retries: int = 0
+    cached: bool = False
+    error: str | None = None
+
+
+class MetricsSink(Protocol):
+    def record_request(self, metrics: RequestMetrics) -> None: ...
+
+    def record_decode(self, action: str, seconds: float) -> None: ...
+
+
+class CallbackSink:
+    def __init__(
+        self,
+        on_request: Callable[[RequestMetrics], None] | None = None,
+        on_decode: Callable[[str, float], None] | None = None,
+    ) -> None:
+        self.on_request = on_request
+        self.on_decode = on_decode
+
+    def record_request(self, metrics: RequestMetrics) -> None:
+        if self.on_request is not None:
+            self.on_request(metrics)
+
+    def record_decode(self, action: str, seconds: float) -> None:
+        if self.on_decode is not None:
+            self.on_decode(action, seconds)
+
+
+class MultiSink:
+    def __init__(self, *sinks: MetricsSink) -> None:
+        self.sinks = sinks
+
+    def record_request(self, metrics: RequestMetrics) -> None:
+        for sink in self.sinks:
+            sink.record_request(metrics)
+
+    def record_decode(self, action: str, seconds: float) -> None:
+        for sink in self.sinks:
+            sink.record_decode(action, seconds)
+
+
+# Fixed log-spaced buckets (4 per decade). Quantiles are interpolated inside a bucket, which keeps memory
+# constant no matter how many observations are made.
+class Histogram:
+    __slots__ = ("bounds", "buckets", "count", "max", "sum")
+
+    def __init__(self, bounds: Iterable[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def log_spaced(cls, low: float, high: float, per_decade: int = 4) -> Histogram:
+        steps = round(math.log10(high / low) * per_decade)
+        return cls(low * 10 ** (i / per_decade) for i in range(steps + 1))
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        total = 0
+        for bound, n in zip(self.bounds, self.buckets, strict=False):
+            total += n
+            yield bound, total
+        yield math.inf, self.count
+
+
+class _ActionStats:
+    __slots__ = ("bytes", "cached", "decode", "errors", "latency", "requests", "retries", "ttfb")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.cached = 0
+        self.retries = 0
+        self.bytes = 0
+        self.ttfb = Histogram.log_spaced(0.001, 100.0)
+        self.latency = Histogram.log_spaced(0.001, 100.0)
+        self.decode = Histogram.log_spaced(0.0001, 100.0)
+
+
+# In-process aggregation per action, readable as a summary dict or as Prometheus text exposition.
+class HistogramSink:
+    SUMMARY_QUANTILES: Final[tuple[float, ...]] = (0.5, 0.9, 0.99)
+
+    def __init__(self, namespace: str = "xtream") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._actions: dict[str, _ActionStats] = {}
+
+    def record_request(self, metrics: RequestMetrics) -> None:
+        with self._lock:
+            stats = self._stats(metrics.action)
+            stats.requests += 1
+            stats.retries += metrics.retries
+            stats.bytes += metrics.size
+            if metrics.error is not None:
+                stats.errors += 1
+            if metrics.cached:
+                stats.cached += 1
+                return
+            stats.ttfb.observe(metrics.ttfb)
+            stats.latency.observe(metrics.latency)
+
+    def record_decode(self, action: str, seconds: float) -> None:
+        with self._lock:
+            self._stats(action).decode.observe(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            result: dict[str, dict[str, float]] = {}
+            for action, stats in sorted(self._actions.items()):
+                row: dict[str, float] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "cached": stats.cached,
+                    "retries": stats.retries,
+                    "bytes": stats.bytes,
+                    "latency_mean": stats.latency.mean,
+                    "decode_mean": stats.decode.mean,
+                }
+                for q in self.SUMMARY_QUANTILES:
+                    label = f"p{round(q * 100)}"
+                    row[f"ttfb_{label}"] = stats.ttfb.quantile(q)
+                    row[f"latency_{label}"] = stats.latency.quantile(q)
+                    row[f"decode_{label}"] = stats.decode.quantile(q)
+                result[action] = row
+            return result
+
+    def to_prometheus(self) -> str:
+        ns = self.namespace
+        lines: list[str] = []
+        with self._lock:
+            items = sorted(self._actions.items())
+            for name, attr in (("requests_total", "requests"), ("errors_total", "errors"), ("cache_hits_total", "cached")):
+                lines.append(f"# TYPE {ns}_{name} counter")
+                lines.extend(f'{ns}_{name}{{action="{action}"}} {getattr(stats, attr)}' for action, stats in items)
+            lines.append(f"# TYPE {ns}_retries_total counter")
+            lines.extend(f'{ns}_retries_total{{action="{action}"}} {stats.retries}' for action, stats in items)
+            lines.append(f"# TYPE {ns}_response_bytes_total counter")
+            lines.extend(f'{ns}_response_bytes_total{{action="{action}"}} {stats.bytes}' for action, stats in items)
+            for name, attr in (("ttfb_seconds", "ttfb"), ("latency_seconds", "latency"), ("decode_seconds", "decode")):
+                lines.append(f"# TYPE {ns}_{name} histogram")
+                for action, stats in items:
+                    histogram: Histogram = getattr(stats, attr)
+                    for bound, total in histogram.cumulative():
+                        le = "+Inf" if math.isinf(bound) else f"{bound:.6g}"
+                        lines.append(f'{ns}_{name}_bucket{{action="{action}",le="{le}"}} {total}')
+                    lines.append(f'{ns}_{name}_sum{{action="{action}"}} {histogram.sum:.6f}')
+                    lines.append(f'{ns}_{name}_count{{action="{action}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def _stats(self, action: str) -> _ActionStats:
+        stats = self._actions.get(action)
+        if stats is None:
+            stats = self._actions[action] = _ActionStats()
+        return stats
+
+
+# Wraps the chunk iterator of a streamed body, counting bytes and the time spent waiting on the network, so that
+# whatever the consumer spends beyond that can be attributed to decoding.
+class ChunkMeter:
+    __slots__ = ("_chunks", "network", "size")
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self.size = 0
+        self.network = 0.0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            started = time.perf_counter()
+            chunk = next(self._chunks, None)
+            self.network += time.perf_counter() - started
+            if chunk is None:
+                return
+            self.size += len(chunk)
+            yield chunk
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+# Panels encode most numbers as strings ("1518032077", "4.5", "") and send null where a field does not apply.
+# The converters below run once at parse time so the records carry real ints/floats, and the handful of
+# low-cardinality strings (category ids, container extensions, stream types) are interned so every record
+# that shares a value shares one string object.
+
+
+def to_int(value: Any, default: int = 0) -> int:  # noqa: ANN401
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def to_float(value: Any, default: float = 0.0) -> float:  # noqa: ANN401
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_str(value: Any) -> str | None:  # noqa: ANN401
+    if value is None or value == "":
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def intern_str(value: Any) -> str:  # noqa: ANN401
+    if value is None:
+        return ""
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+# Short EPG text fields are base64; anything that does not decode is returned unchanged.
+def from_base64(value: str) -> str:
+    if not value:
+        return value
+    try:
+        return base64.b64decode(value, validate=True).decode("utf-8", "replace")
+    except (binascii.Error, ValueError):
+        return value
+
+
+@dataclass(frozen=True, slots=True)
+class Category:
+    category_id: str
+    category_name: str
+    parent_id: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        return cls(
+            category_id=intern_str(data.get("category_id")),
+            category_name=data.get("category_name") or "",
+            parent_id=to_int(data.get("parent_id")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class LiveStream:
+    stream_id: int
+    name: str
+    category_id: str
+    num: int = 0
+    stream_type: str = "live"
+    stream_icon: str | None = None
+    epg_channel_id: str | None = None
+    added: int = 0
+    custom_sid: str | None = None
+    tv_archive: int = 0
+    tv_archive_duration: int = 0
+    direct_source: str | None = None
+
+    @property
+    def key(self) -> int:
+        return self.stream_id
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        return cls(
+            stream_id=to_int(data.get("stream_id")),
+            name=data.get("name") or "",
+            category_id=intern_str(data.get("category_id")),
+            num=to_int(data.get("num")),
+            stream_type=intern_str(data.get("stream_type") or "live"),
+            stream_icon=to_str(data.get("stream_icon")),
+            epg_channel_id=to_str(data.get("epg_channel_id")),
+            added=to_int(data.get("added")),
+            custom_sid=to_str(data.get("custom_sid")),
+            tv_archive=to_int(data.get("tv_archive")),
+            tv_archive_duration=to_int(data.get("tv_archive_duration")),
+            direct_source=to_str(data.get("direct_source")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VodStream:
+    stream_id: int
+    name: str
+    category_id: str
+    num: int = 0
+    stream_type: str = "movie"
+    stream_icon: str | None = None
+    rating_5based: float = 0.0
+    added: int = 0
+    container_extension: str = ""
+    tmdb: str | None = None
+    custom_sid: str | None = None
+    direct_source: str | None = None
+
+    @property
+    def key(self) -> int:
+        return self.stream_id
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        return cls(
+            stream_id=to_int(data.get("stream_id")),
+            name=data.get("name") or "",
+            category_id=intern_str(data.get("category_id")),
+            num=to_int(data.get("num")),
+            stream_type=intern_str(data.get("stream_type") or "movie"),
+            stream_icon=to_str(data.get("stream_icon")),
+            rating_5based=to_float(data.get("rating_5based")),
+            added=to_int(data.get("added")),
+            container_extension=intern_str(data.get("container_extension")),
+            tmdb=to_str(data.get("tmdb") or data.get("tmdb_id")),
+            custom_sid=to_str(data.get("custom_sid")),
+            direct_source=to_str(data.get("direct_source")),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Series:
+    series_id: int
+    name: str
+    category_id: str
+    num: int = 0
+    cover: str | None = None
+    plot: str | None = None
+    genre: str | None = None
+    release_date: str | None = None
+    rating_5based: float = 0.0
+    last_modified: int = 0
+    tmdb: str | None = None
+
+    @property
+    def key(self) -> int:
+        return self.series_id
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        return cls(
+            series_id=to_int(data.get("series_id")),
+            name=data.get("name") or "",
+            category_id=intern_str(data.get("category_id")),
+            num=to_int(data.get("num")),
+            cover=to_str(data.get("cover")),
+            plot=to_str(data.get("plot")),
+            genre=to_str(data.get("genre")),
+            release_date=to_str(data.get("releaseDate") or data.get("release_date")),
+            rating_5based=to_float(data.get("rating_5based")),
+            last_modified=to_int(data.get("last_modified")),
+            tmdb=to_str(data.get("tmdb") or data.get("tmdb_id")),
+        )
+
+
+# One entry of get_short_epg / get_simple_data_table. `title` and `description` are kept exactly as the
+# panel sends them (base64) and only decoded when `decoded_title` / `decoded_description` are read.
+@dataclass(frozen=True, slots=True)
+class EpgEntry:
+    id: int
+    epg_id: int
+    channel_id: str
+    title: str
+    description: str
+    lang: str
+    start_timestamp: int
+    stop_timestamp: int
+
+    @property
+    def decoded_title(self) -> str:
+        return from_base64(self.title)
+
+    @property
+    def decoded_description(self) -> str:
+        return from_base64(self.description)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        return cls(
+            id=to_int(data.get("id")),
+            epg_id=to_int(data.get("epg_id")),
+            channel_id=intern_str(data.get("channel_id")),
+            title=data.get("title") or "",
+            description=data.get("description") or "",
+            lang=intern_str(data.get("lang")),
+            start_timestamp=to_int(data.get("start_timestamp")),
+            stop_timestamp=to_int(data.get("stop_timestamp")),
+        )
+
+
+StreamRecord = LiveStream | VodStream | Series
+
+
+# Column-oriented container for a whole listing: ids, timestamps and category references live in packed
+# arrays (8 bytes per value instead of a boxed int per field per dict), and names stay in one list.
+class StreamTable:
+    __slots__ = ("_category_index", "added", "categories", "category_refs", "names", "stream_ids")
+
+    def __init__(self) -> None:
+        self.stream_ids: array[int] = array("q")
+        self.added: array[int] = array("q")
+        self.category_refs: array[int] = array("l")
+        self.categories: list[str] = []
+        self.names: list[str] = []
+        self._category_index: dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[StreamRecord]) -> Self:
+        table = cls()
+        table.extend(records)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.stream_ids)
+
+    def append(self, record: StreamRecord) -> None:
+        ref = self._category_index.get(record.category_id)
+        if ref is None:
+            ref = self._category_index[record.category_id] = len(self.categories)
+            self.categories.append(record.category_id)
+        self.stream_ids.append(record.key)
+        self.added.append(record.last_modified if isinstance(record, Series) else record.added)
+        self.category_refs.append(ref)
+        self.names.append(record.name)
+
+    def extend(self, records: Iterable[StreamRecord]) -> None:
+        for record in records:
+            self.append(record)
+
+    def category_id(self, index: int) -> str:
+        return self.categories[self.category_refs[index]]
+
+    def rows(self) -> Iterator[tuple[int, str, str, int]]:
+        for i in range(len(self)):
+            yield self.stream_ids[i], self.names[i], self.category_id(i), self.added[i]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Final
+
+import requests
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from xtream._models import EpgEntry
+    from xtream._xtream import XTream
+
+logger = logging.getLogger(__name__)
+
+
+# Fetches get_short_epg for many live streams at once and keeps each channel's listing until the programme
+# airing when it was fetched ends, which is the earliest moment now/next can change. Channels without a
+# current programme are retried when their next one starts, or after `empty_ttl`. Failed channels are logged
+# and left out of the result.
+class ShortEpgFetcher:
+    DEFAULT_WORKERS: Final[int] = 16
+    DEFAULT_LIMIT: Final[int] = 4
+    DEFAULT_EMPTY_TTL: Final[float] = 300.0
+
+    def __init__(
+        self,
+        client: XTream,
+        workers: int = DEFAULT_WORKERS,
+        limit: int = DEFAULT_LIMIT,
+        empty_ttl: float = DEFAULT_EMPTY_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.workers = workers
+        self.limit = limit
+        self.empty_ttl = empty_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cache: dict[int, tuple[float, list[EpgEntry]]] = {}
+
+    # Listings for every stream in `stream_ids`, from the cache where still valid and fetched concurrently otherwise.
+    def fetch(self, stream_ids: Iterable[int]) -> dict[int, list[EpgEntry]]:
+        now = self.clock()
+        result: dict[int, list[EpgEntry]] = {}
+        missing: list[int] = []
+        with self._lock:
+            for stream_id in dict.fromkeys(stream_ids):
+                cached = self._cache.get(stream_id)
+                if cached is not None and cached[0] > now:
+                    result[stream_id] = cached[1]
+                else:
+                    missing.append(stream_id)
+        if not missing:
+            return result
+        logger.debug("Fetching short EPG for %d of %d streams", len(missing), len(missing) + len(result))
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(missing)), thread_name_prefix="xtream-epg") as executor:
+            fetched = zip(missing, executor.map(self._fetch_one, missing), strict=True)
+            result.update({stream_id: listings for stream_id, listings in fetched if listings is not None})
+        return result
+
+    # (now, next) per stream; either side is None when the listing does not cover it.
+    def now_next(self, stream_ids: Iterable[int], at: float | None = None) -> dict[int, tuple[EpgEntry | None, EpgEntry | None]]:
+        moment = self.clock() if at is None else at
+        result: dict[int, tuple[EpgEntry | None, EpgEntry | None]] = {}
+        for stream_id, listings in self.fetch(stream_ids).items():
+            current = next((e for e in listings if e.start_timestamp <= moment < e.stop_timestamp), None)
+            upcoming = next((e for e in listings if e.start_timestamp > moment), None)
+            result[stream_id] = (current, upcoming)
+        return result
+
+    def invalidate(self, stream_id: int | None = None) -> None:
+        with self._lock:
+            if stream_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(stream_id, None)
+
+    def _fetch_one(self, stream_id: int) -> list[EpgEntry] | None:
+        try:
+            # Expiry is decided here from the programme times; a cached response could outlive the programme.
+            listings = self.client.short_epg_records(str(stream_id), self.limit, cached=False)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Short EPG for stream %s failed: %s", stream_id, e)
+            return None
+        listings.sort(key=lambda e: e.start_timestamp)
+        now = self.clock()
+        current = next((e for e in listings if e.start_timestamp <= now < e.stop_timestamp), None)
+        if current is not None:
+            expires_at: float = current.stop_timestamp
+        else:
+            # Nothing airing: ask again when the next listed programme starts, or after empty_ttl.
+            expires_at = min([now + self.empty_ttl, *(e.start_timestamp for e in listings if e.start_timestamp > now)])
+        with self._lock:
+            self._cache[stream_id] = (expires_at, listings)
+        return listings
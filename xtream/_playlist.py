@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Final, Protocol, Self
+from urllib.parse import quote, urlencode, urljoin
+
+from xtream._models import LiveStream, Series, VodStream
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+    from types import TracebackType
+
+    from xtream._models import StreamRecord
+
+# Preferred live container, in order, when picking from the account's allowed_output_formats.
+LIVE_EXTENSIONS: Final[tuple[str, ...]] = ("ts", "m3u8")
+
+
+def choose_live_extension(allowed_output_formats: Sequence[str], preferred: Sequence[str] = LIVE_EXTENSIONS) -> str:
+    for ext in preferred:
+        if ext in allowed_output_formats:
+            return ext
+    return allowed_output_formats[0] if allowed_output_formats else preferred[0]
+
+
+# Builds playable URLs (http(s)://domain:port/{live,movie,series}/username/password/id.ext). The three
+# per-account prefixes are quoted and joined once, so each URL afterwards is a single concatenation.
+class StreamUrlBuilder:
+    __slots__ = ("epg_url", "live_extension", "live_prefix", "movie_prefix", "series_prefix")
+
+    def __init__(self, server: str, username: str, password: str, live_extension: str = LIVE_EXTENSIONS[0]) -> None:
+        account = f"{quote(username, safe='')}/{quote(password, safe='')}/"
+        self.live_prefix = urljoin(server, "live/" + account)
+        self.movie_prefix = urljoin(server, "movie/" + account)
+        self.series_prefix = urljoin(server, "series/" + account)
+        self.epg_url = urljoin(server, "/xmltv.php") + "?" + urlencode({"username": username, "password": password})
+        self.live_extension = live_extension
+
+    def live(self, stream_id: int | str, extension: str | None = None) -> str:
+        return f"{self.live_prefix}{stream_id}.{extension or self.live_extension}"
+
+    def movie(self, stream_id: int | str, extension: str) -> str:
+        return f"{self.movie_prefix}{stream_id}.{extension}"
+
+    # Series are containers; their playable ids are the episode ids listed by get_series_info.
+    def episode(self, episode_id: int | str, extension: str) -> str:
+        return f"{self.series_prefix}{episode_id}.{extension}"
+
+    def url(self, record: StreamRecord) -> str:
+        if isinstance(record, LiveStream):
+            return self.live(record.stream_id)
+        if isinstance(record, VodStream):
+            return self.movie(record.stream_id, record.container_extension or "mp4")
+        msg = f"Series {record.series_id} has no stream URL of its own, build one per episode with episode()"
+        raise ValueError(msg)
+
+
+class Writable(Protocol):
+    def write(self, data: bytes, /) -> object: ...
+
+
+# EXTINF attribute values are double-quoted and the title runs to the end of the line. str.translate is slow
+# compared to a membership test, so values are only rewritten when they actually contain one of these.
+_ATTRIBUTE: Final = str.maketrans({'"': "'", "\r": " ", "\n": " "})
+
+
+def _attribute(value: str) -> str:
+    return value.translate(_ATTRIBUTE) if '"' in value or "\n" in value or "\r" in value else value
+
+
+def _title(value: str) -> str:
+    return value.replace("\r", " ").replace("\n", " ") if "\n" in value or "\r" in value else value
+
+
+# Writes an extended M3U playlist (UTF-8, so equally valid as .m3u8) to any binary sink: a file opened with
+# "wb", a socket's makefile("wb"), a response stream. Entries are rendered straight to text and handed to the
+# sink in batches of `batch_size`, so memory stays flat however long the playlist is.
+class M3UWriter:
+    DEFAULT_BATCH_SIZE: Final[int] = 1024
+
+    def __init__(
+        self,
+        out: Writable,
+        urls: StreamUrlBuilder,
+        categories: Mapping[str, str] | None = None,
+        epg_url: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.out = out
+        self.urls = urls
+        self.categories = categories or {}
+        self.batch_size = batch_size
+        self.count = 0
+        header = f'#EXTM3U url-tvg="{_attribute(epg_url)}"\n' if epg_url else "#EXTM3U\n"
+        self._pending: list[str] = [header]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.flush()
+
+    # Series records are skipped: they are not playable by themselves.
+    def write(self, record: StreamRecord) -> None:
+        if isinstance(record, Series):
+            return
+        self.write_entry(
+            self.urls.url(record),
+            record.name,
+            tvg_id=record.epg_channel_id if isinstance(record, LiveStream) else None,
+            logo=record.stream_icon,
+            group=self.categories.get(record.category_id, record.category_id),
+        )
+
+    def write_entry(  # noqa: PLR0913
+        self,
+        url: str,
+        title: str,
+        *,
+        tvg_id: str | None = None,
+        logo: str | None = None,
+        group: str | None = None,
+        duration: int = -1,
+    ) -> None:
+        tvg_id = f'tvg-id="{_attribute(tvg_id)}" ' if tvg_id else ""
+        logo = f' tvg-logo="{_attribute(logo)}"' if logo else ""
+        group = f' group-title="{_attribute(group)}"' if group else ""
+        self._pending.append(f'#EXTINF:{duration} {tvg_id}tvg-name="{_attribute(title)}"{logo}{group},{_title(title)}\n{url}\n')
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, records: Iterable[StreamRecord]) -> int:
+        before = self.count
+        for record in records:
+            self.write(record)
+        return self.count - before
+
+    def flush(self) -> None:
+        if self._pending:
+            self.out.write("".join(self._pending).encode())
+            self._pending.clear()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Final, Self, TypeVar
+
+import requests
+
+from xtream._catalog import Catalog
+from xtream._models import LiveStream, Series, VodStream, to_int
+from xtream._search import normalize_name
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+    from types import TracebackType
+
+    from xtream._models import StreamRecord
+    from xtream._xtream import XTream
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses that condemn the account rather than the title: the credentials were refused or the line is blocked.
+ACCOUNT_FAILURE_STATUSES: Final[frozenset[int]] = frozenset({HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN})
+
+
+# One provider account and what is known about its connection budget. `in_flight` counts the requests this
+# pool has routed to it since, so that spare capacity stays accurate between two authenticate() calls.
+@dataclass(slots=True, eq=False)
+class PoolAccount:
+    client: XTream
+    max_connections: int = 0
+    active_connections: int = 0
+    in_flight: int = 0
+    available: bool = True
+    checked_at: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.client.username}@{self.client.server}"
+
+    @property
+    def spare(self) -> int:
+        return self.max_connections - self.active_connections - self.in_flight
+
+
+# A title as offered by one or more accounts; `sources` pairs each account with its own record (stream ids are
+# provider-specific, so detail requests always use the record of the account they are sent to).
+@dataclass(slots=True)
+class MergedTitle:
+    record: StreamRecord
+    sources: list[tuple[PoolAccount, StreamRecord]] = field(default_factory=list)
+
+
+# Identity keys for cross-provider dedupe, strongest first: the EPG channel id for live streams, the TMDB id for
+# movies and series, and the normalized name for everything.
+def dedupe_keys(record: StreamRecord) -> list[tuple[type, str, str]]:
+    kind = type(record)
+    keys: list[tuple[type, str, str]] = []
+    if isinstance(record, LiveStream) and record.epg_channel_id:
+        keys.append((kind, "epg", record.epg_channel_id.casefold()))
+    elif isinstance(record, VodStream | Series) and record.tmdb and record.tmdb != "0":
+        keys.append((kind, "tmdb", record.tmdb))
+    name = normalize_name(record.name)
+    if name:
+        keys.append((kind, "name", name))
+    return keys
+
+
+# Holds several provider accounts: catalogs are fetched from all of them concurrently and merged, and every
+# per-title request is routed to the account (among those offering the title) with the most spare connections
+# according to max_connections - active_cons from authenticate(), falling back to the next one on failure.
+class XTreamPool:
+    DEFAULT_STATUS_TTL: Final[float] = 60.0
+    # Assumed connection budget when a panel does not report max_connections.
+    DEFAULT_MAX_CONNECTIONS: Final[int] = 1
+
+    def __init__(self, clients: Iterable[XTream], status_ttl: float = DEFAULT_STATUS_TTL) -> None:
+        self.accounts = [PoolAccount(client) for client in clients]
+        if not self.accounts:
+            msg = "XTreamPool needs at least one client"
+            raise ValueError(msg)
+        self.status_ttl = status_ttl
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.accounts), thread_name_prefix="xtream-pool")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for account in self.accounts:
+            account.client.close()
+
+    # Re-reads the connection budget of every account concurrently; accounts that fail to authenticate are
+    # marked unavailable until the next refresh.
+    def refresh_status(self) -> None:
+        for account, user_info in zip(self.accounts, self._executor.map(self._user_info, self.accounts), strict=True):
+            with self._lock:
+                account.checked_at = time.monotonic()
+                account.available = user_info is not None and user_info.get("auth", 1) not in {0, "0"}
+                if user_info is not None:
+                    account.max_connections = to_int(user_info.get("max_connections")) or self.DEFAULT_MAX_CONNECTIONS
+                    account.active_connections = to_int(user_info.get("active_cons"))
+
+    # Fetches the `stream_type` catalog of every available account concurrently. Accounts that fail are logged,
+    # marked unavailable and left out.
+    def fetch_catalogs(self, stream_type: str) -> dict[PoolAccount, Catalog]:
+        self._ensure_status()
+        accounts = [account for account in self.accounts if account.available]
+        fetched = self._executor.map(lambda account: self._fetch_catalog(account, stream_type), accounts)
+        return {account: catalog for account, catalog in zip(accounts, fetched, strict=True) if catalog is not None}
+
+    def fetch_merged(self, stream_type: str) -> list[MergedTitle]:
+        return self.merge(self.fetch_catalogs(stream_type))
+
+    # Groups identical titles across accounts. A record joins the group of the first of its dedupe keys already
+    # seen and registers all its keys there, so a title matched by TMDB id on one provider and by name on
+    # another still ends up in one group. A name match is ignored when the record and the group carry different
+    # TMDB / EPG ids: those are different titles that normalize to the same name.
+    @staticmethod
+    def merge(catalogs: Mapping[PoolAccount, Catalog]) -> list[MergedTitle]:
+        groups: dict[tuple[type, str, str], MergedTitle] = {}
+        # id(group) -> the strong key of its first record that had one
+        strong_keys: dict[int, tuple[type, str, str]] = {}
+        merged: list[MergedTitle] = []
+        for account, catalog in catalogs.items():
+            for record in catalog:
+                keys = dedupe_keys(record)
+                strong = keys[0] if keys and keys[0][1] != "name" else None
+                title = next(
+                    (groups[key] for key in keys if key in groups and (strong is None or strong_keys.get(id(groups[key]), strong) == strong)),
+                    None,
+                )
+                if title is None:
+                    title = MergedTitle(record)
+                    merged.append(title)
+                title.sources.append((account, record))
+                if strong is not None:
+                    strong_keys.setdefault(id(title), strong)
+                for key in keys:
+                    groups.setdefault(key, title)
+        return merged
+
+    # get_vod_info / get_series_info for a merged title, fetched once from the best placed account.
+    def info(self, title: MergedTitle) -> Any:  # noqa: ANN401
+        sources = dict(title.sources)
+
+        def fetch(account: PoolAccount) -> Any:  # noqa: ANN401
+            record = sources[account]
+            client = account.client
+            response = client.series_info_by_id(str(record.key)) if isinstance(record, Series) else client.vod_info_by_id(str(record.key))
+            return client.decode(response)
+
+        return self.call(fetch, list(sources))
+
+    # Runs `fn` against the account with the most spare connections among `accounts` (all by default), trying
+    # the others in turn when it raises a requests error. Raises the last error when every account failed, and
+    # LookupError when none was available. Only connection failures, timeouts and refused credentials take an
+    # account out of rotation; an HTTP error about the title itself (404, 500) just moves on to the next account.
+    def call(self, fn: Callable[[PoolAccount], T], accounts: Sequence[PoolAccount] | None = None) -> T:
+        self._ensure_status()
+        tried: set[int] = set()
+        error: requests.RequestException | None = None
+        while (account := self._acquire(accounts or self.accounts, tried)) is not None:
+            try:
+                return fn(account)
+            except requests.RequestException as e:  # noqa: PERF203
+                logger.warning("Request to %s failed, trying the next account: %s", account.name, e)
+                error = e
+                if _account_failure(e):
+                    # Skipped by later calls until the next status refresh finds it reachable again.
+                    account.available = False
+            finally:
+                with self._lock:
+                    account.in_flight -= 1
+        if error is not None:
+            raise error
+        msg = "No available account in the pool"
+        raise LookupError(msg)
+
+    def _acquire(self, accounts: Sequence[PoolAccount], tried: set[int]) -> PoolAccount | None:
+        with self._lock:
+            candidates = [a for a in accounts if a.available and id(a) not in tried]
+            if not candidates:
+                return None
+            account = max(candidates, key=lambda a: a.spare)
+            account.in_flight += 1
+            tried.add(id(account))
+            return account
+
+    def _fetch_catalog(self, account: PoolAccount, stream_type: str) -> Catalog | None:
+        try:
+            return Catalog.fetch(account.client, stream_type)
+        except requests.RequestException as e:
+            logger.warning("Fetching %s catalog from %s failed: %s", stream_type, account.name, e)
+            with self._lock:
+                account.available = False
+            return None
+
+    def _ensure_status(self) -> None:
+        deadline = time.monotonic() - self.status_ttl
+        if any(account.checked_at <= deadline for account in self.accounts):
+            self.refresh_status()
+
+    @staticmethod
+    def _user_info(account: PoolAccount) -> dict[str, Any] | None:
+        try:
+            data = account.client.decode(account.client.authenticate())
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Authenticating %s failed: %s", account.name, e)
+            return None
+        user_info = data.get("user_info") if isinstance(data, dict) else None
+        return user_info if isinstance(user_info, dict) else None
+
+
+def _account_failure(error: requests.RequestException) -> bool:
+    if isinstance(error, requests.ConnectionError | requests.Timeout):
+        return True
+    response = error.response if isinstance(error, requests.HTTPError) else None
+    return response is not None and response.status_code in ACCOUNT_FAILURE_STATUSES
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+    from xtream._models import StreamRecord
+
+# Country and language codes panels put in front of names ("UK: ", "FR - ", "ENG| "). Only these are stripped,
+# so a title such as "CSI: Miami" keeps its first word.
+NAME_PREFIX_CODES: Final[frozenset[str]] = frozenset(
+    {
+        "AF", "AL", "AR", "ARA", "AT", "AU", "BE", "BG", "BR", "CA", "CH", "CN", "CZ", "DE", "DK", "EN", "ENG", "ES", "EX",
+        "FI", "FR", "FRE", "GER", "GR", "HR", "HU", "IE", "IN", "IR", "IT", "ITA", "JP", "KR", "KU", "LAT", "MX", "NL",
+        "NO", "PH", "PK", "PL", "POL", "POR", "PT", "RO", "RS", "RU", "SE", "SK", "SPA", "TH", "TR", "TUR", "UA", "UK",
+        "US", "USA", "VN", "YU",
+    }
+)  # fmt: skip
+QUALITY_TOKENS: Final[frozenset[str]] = frozenset(
+    {"4k", "8k", "uhd", "fhd", "hd", "sd", "hq", "hdr", "hevc", "h264", "h265", "x264", "x265", "1080p", "720p", "2160p", "multi"}
+)
+# Words a "|EN|" / "[4K]" style tag may be made of, one or several ("[FHD HEVC]", "|EN/FR|"). Any other text
+# between pipes or brackets is part of the name: "News | Sport | Weather" or a year such as "[2019]".
+TAG_TOKENS: Final[frozenset[str]] = QUALITY_TOKENS | {code.casefold() for code in NAME_PREFIX_CODES} | {"vip", "sub", "dub", "vostfr", "ppv"}
+_TAG: Final = "|".join(re.escape(token) for token in sorted(TAG_TOKENS, key=len, reverse=True))
+_TAG_GROUP: Final = rf"\s*(?:{_TAG})(?:[\s/,+-]+(?:{_TAG}))*\s*"
+# Provider decorations that carry no meaning for search: tags made of the words above, the country prefixes and,
+# in normalize_name, quality or codec markers.
+_TAGS: Final = re.compile(rf"(?i:\|{_TAG_GROUP}\||\[{_TAG_GROUP}\])|^\s*(?:{'|'.join(sorted(NAME_PREFIX_CODES))})\s*(?::|\||-)\s+")
+_NON_WORD: Final = re.compile(r"[^\w]+|_")
+# Leading articles ignored when deciding whether a name is exactly the query ("the matrix" for "matrix").
+ARTICLES: Final[frozenset[str]] = frozenset({"the", "a", "an", "le", "la", "les", "l", "der", "die", "das", "el", "los", "il"})
+
+
+def normalize_name(name: str) -> str:
+    name = _TAGS.sub(" ", name)
+    if not name.isascii():
+        name = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    name = name.casefold()
+    return " ".join(token for token in _NON_WORD.sub(" ", name).split() if token not in QUALITY_TOKENS)
+
+
+def _strip_article(normalized: str) -> str:
+    article, _, rest = normalized.partition(" ")
+    return rest if rest and article in ARTICLES else normalized
+
+
+def trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    record: StreamRecord
+    score: float
+
+
+class _Hits:
+    __slots__ = ("kinds", "limit", "results", "seen")
+
+    def __init__(self, limit: int, kinds: Collection[type] | None) -> None:
+        self.limit = limit
+        self.kinds = kinds
+        self.results: list[SearchResult] = []
+        self.seen: set[int] = set()
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - len(self.results)
+
+
+# Name search over any mix of live streams, VOD and series. Every normalized token and every trigram maps to a
+# packed array of document numbers. Queries try, in order: every query token matching a whole name token,
+# every query token matching a token prefix, then trigram similarity for typos. The prefix tier only runs while
+# fewer than `limit` hits were found, and the trigram tier only when the other two found nothing. Removed
+# documents are tombstoned and the postings are rebuilt once a quarter of them are dead.
+class SearchIndex:
+    EXACT_SCORE: Final[float] = 3.0
+    PREFIX_SCORE: Final[float] = 2.0
+    MIN_SIMILARITY: Final[float] = 0.3
+    # Trigrams present in more than this share of documents are skipped when others are available; they
+    # would cost the most to count and discriminate the least.
+    COMMON_TRIGRAM_SHARE: Final[float] = 0.02
+    MIN_TRIGRAMS: Final[int] = 3
+    # A very short prefix ("a") can match most of the catalog. Prefix candidates stop being gathered past this
+    # many; the hits are still genuine matches, only the ranking among them is no longer exhaustive.
+    MAX_PREFIX_CANDIDATES: Final[int] = 20000
+    MAX_PREFIX_EXPANSIONS: Final[int] = 1000
+    # Trigram postings counted per fuzzy query, beyond the MIN_TRIGRAMS shortest lists.
+    MAX_FUZZY_POSTINGS: Final[int] = 30000
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self._records: list[StreamRecord | None] = []
+        self._names: list[str] = []
+        self._lengths: array[int] = array("l")
+        self._positions: dict[tuple[type, int], int] = {}
+        self._tokens: dict[str, array[int]] = {}
+        self._trigrams: dict[str, array[int]] = {}
+        self._trigram_counts: array[int] = array("l")
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+        self._dead: set[int] = set()
+
+    @classmethod
+    def from_records(cls, records: Iterable[StreamRecord]) -> Self:
+        index = cls()
+        index.extend(records)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, record: object) -> bool:
+        return (type(record), getattr(record, "key", None)) in self._positions
+
+    # Adds `record`, replacing an earlier record of the same type and key.
+    def add(self, record: StreamRecord) -> None:
+        if (type(record), record.key) in self._positions:
+            self.remove(record)
+        self._insert(record, normalize_name(record.name))
+
+    def extend(self, records: Iterable[StreamRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def remove(self, record: StreamRecord) -> bool:
+        doc = self._positions.pop((type(record), record.key), None)
+        if doc is None:
+            return False
+        self._records[doc] = None
+        self._dead.add(doc)
+        if len(self._dead) > len(self._records) // 4:
+            self._rebuild()
+        return True
+
+    def search(self, query: str, limit: int = 20, kinds: Collection[type] | None = None, fuzzy: bool = True) -> list[SearchResult]:
+        normalized = normalize_name(query)
+        tokens = normalized.split()
+        if not tokens or limit <= 0:
+            return []
+        hits = _Hits(limit, kinds)
+        self._collect(self._exact(tokens), self.EXACT_SCORE, normalized, hits)
+        if hits.remaining > 0:
+            self._collect(self._prefixed(tokens), self.PREFIX_SCORE, normalized, hits)
+        if fuzzy and not hits.results:
+            self._fuzzy(normalized, hits)
+        return hits.results
+
+    def _insert(self, record: StreamRecord, normalized: str) -> None:
+        doc = len(self._records)
+        self._records.append(record)
+        self._names.append(normalized)
+        self._lengths.append(len(normalized))
+        self._positions[type(record), record.key] = doc
+        for token in set(normalized.split()):
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = array("l")
+                self._vocabulary_dirty = True
+            postings.append(doc)
+        grams = trigrams(normalized)
+        self._trigram_counts.append(len(grams))
+        for gram in grams:
+            postings = self._trigrams.get(gram)
+            if postings is None:
+                postings = self._trigrams[gram] = array("l")
+            postings.append(doc)
+
+    # Documents containing every token, intersecting from the shortest posting list.
+    def _exact(self, tokens: list[str]) -> set[int]:
+        postings = sorted((self._tokens.get(token, ()) for token in tokens), key=len)
+        docs = set(postings[0])
+        for other in postings[1:]:
+            if not docs:
+                break
+            docs.intersection_update(other)
+        return docs - self._dead
+
+    # Documents where every query token is the prefix of some name token. Candidates come from the token with
+    # the fewest vocabulary expansions; the others are intersected in the same way while that stays cheap, and
+    # checked against the candidates' names otherwise.
+    def _prefixed(self, tokens: list[str]) -> set[int]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._tokens)
+            self._vocabulary_dirty = False
+        ranges = sorted((self._prefix_range(token), token) for token in tokens)
+        (lo, hi), seed = min(ranges, key=lambda r: r[0][1] - r[0][0])
+        docs: set[int] = set()
+        for word in self._vocabulary[lo:hi]:
+            docs.update(self._tokens[word])
+            if len(docs) >= self.MAX_PREFIX_CANDIDATES:
+                break
+        docs -= self._dead
+        rest: list[str] = []
+        for (lo, hi), token in ranges:
+            if token == seed or not docs:
+                continue
+            if hi - lo > self.MAX_PREFIX_EXPANSIONS:
+                rest.append(token)
+                continue
+            matching: set[int] = set()
+            for word in self._vocabulary[lo:hi]:
+                matching.update(self._tokens[word])
+            docs &= matching
+        if rest and docs:
+            names = self._names
+            docs = {doc for doc in docs if all(any(word.startswith(p) for word in names[doc].split()) for p in rest)}
+        return docs
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        lo = bisect_left(self._vocabulary, prefix)
+        return lo, bisect_left(self._vocabulary, prefix + "\U0010ffff", lo)
+
+    def _collect(self, docs: set[int], base: float, query: str, hits: _Hits) -> None:
+        docs -= hits.seen
+        if hits.kinds is not None:
+            docs = {doc for doc in docs if type(self._records[doc]) in hits.kinds}
+        # Shortest (closest) names first; names equal to the query (leading article aside) are moved to the front,
+        # then those starting with the query.
+        pool = heapq.nsmallest(hits.remaining * 4, docs, key=self._lengths.__getitem__)
+        core = _strip_article(query)
+        ranked = sorted((self._rank(doc, query, core), self._lengths[doc], doc) for doc in pool)
+        for rank, length, doc in ranked[: hits.remaining]:
+            hits.seen.add(doc)
+            bonus = (1.0, 0.5, 0.0)[rank]
+            hits.results.append(SearchResult(self._record(doc), base + bonus + len(query) / max(length, 1) * 0.4))
+
+    # 0 for a name that is the query, 1 for one starting with it, 2 otherwise.
+    def _rank(self, doc: int, query: str, core: str) -> int:
+        name = self._names[doc]
+        if name == query or _strip_article(name) == core:
+            return 0
+        return 1 if name.startswith(query) else 2
+
+    # Similarity is the share of the query's (discriminative) trigrams found in a name, damped by the difference
+    # in length so that a short query does not fully match every long name containing it.
+    def _fuzzy(self, query: str, hits: _Hits) -> None:
+        grams = trigrams(query)
+        shared, wanted = self._shared_trigrams(grams)
+        if not wanted:
+            return
+        # Names are visited from the most shared trigrams down. count / wanted bounds the similarity, so the scan
+        # stops once it cannot reach MIN_SIMILARITY or beat the weakest of `remaining` hits already held.
+        best: list[tuple[float, int]] = []
+        for doc, count in shared.most_common():
+            bound = count / wanted
+            if bound < self.MIN_SIMILARITY or (len(best) == hits.remaining and bound <= best[0][0]):
+                break
+            if doc in hits.seen or doc in self._dead or (hits.kinds is not None and type(self._records[doc]) not in hits.kinds):
+                continue
+            size = self._trigram_counts[doc]
+            similarity = bound * (min(size, len(grams)) / max(size, len(grams))) ** 0.5
+            if similarity < self.MIN_SIMILARITY:
+                continue
+            if len(best) < hits.remaining:
+                heapq.heappush(best, (similarity, doc))
+            elif similarity > best[0][0]:
+                heapq.heapreplace(best, (similarity, doc))
+        for similarity, doc in sorted(best, reverse=True):
+            hits.seen.add(doc)
+            hits.results.append(SearchResult(self._record(doc), similarity))
+
+    # Trigrams shared with the query per document, counted over the rarest of the query's trigrams, and how many
+    # of them were counted.
+    def _shared_trigrams(self, grams: set[str]) -> tuple[Counter[int], int]:
+        postings = sorted((self._trigrams[gram] for gram in grams if gram in self._trigrams), key=len)
+        common = max(int(len(self._records) * self.COMMON_TRIGRAM_SHARE), 1000)
+        shared: Counter[int] = Counter()
+        counted = budget = 0
+        for docs in postings:
+            if counted >= self.MIN_TRIGRAMS and (len(docs) > common or budget + len(docs) > self.MAX_FUZZY_POSTINGS):
+                break
+            shared.update(docs)
+            counted += 1
+            budget += len(docs)
+        return shared, counted
+
+    def _record(self, doc: int) -> StreamRecord:
+        record = self._records[doc]
+        if record is None:
+            msg = f"document {doc} was removed"
+            raise LookupError(msg)
+        return record
+
+    # Renumbers the live documents, reusing their normalized names.
+    def _rebuild(self) -> None:
+        live = [(record, name) for record, name in zip(self._records, self._names, strict=True) if record is not None]
+        self._reset()
+        for record, name in live:
+            self._insert(record, name)
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import mmap
+import struct
+import sys
+import threading
+import time
+import typing
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Literal, Self
+
+from xtream._catalog import Catalog
+from xtream._decode import get_decoder
+from xtream._models import Category
+from xtream._sync import fingerprint
+from xtream._xtream import XTream
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+    from concurrent.futures import Future
+    from types import TracebackType
+
+    from xtream._decode import JsonDecoder
+
+logger = logging.getLogger(__name__)
+
+# File layout: a fixed header (magic, format version, size of the table of contents), the table of contents as
+# JSON, then every column back to back, 8-byte aligned. Offsets in the table of contents are relative to the
+# start of the column data. Column encodings:
+#   "q" / "d"  packed int64 / float64, one per row
+#   "s"        int64 end offsets (one per row), the UTF-8 bytes of every value back to back, then a bitmap with
+#              one bit per row (least significant bit first) set where the value is None
+#   "k"        int32 references into a list of distinct values kept in the table of contents (low-cardinality
+#              fields such as category ids and container extensions)
+# Info payloads (get_vod_info / get_series_info) are stored as their raw JSON and only decoded when read.
+MAGIC: Final[bytes] = b"XTSNAP\x00\x00"
+SNAPSHOT_VERSION: Final[int] = 2
+HEADER: Final = struct.Struct("<8sII")
+ALIGNMENT: Final[int] = 8
+DICTIONARY_FIELDS: Final[frozenset[str]] = frozenset({"category_id", "stream_type", "container_extension"})
+
+
+def _align(n: int) -> int:
+    return -n % ALIGNMENT
+
+
+def _kind(field: str, annotation: object) -> str:
+    if field in DICTIONARY_FIELDS:
+        return "k"
+    if annotation is int:
+        return "q"
+    if annotation is float:
+        return "d"
+    return "s"
+
+
+class _Builder:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> list[int]:
+        span = [self.size, len(data)]
+        self.chunks.append(data)
+        self.size += len(data)
+        if pad := _align(self.size):
+            self.chunks.append(b"\x00" * pad)
+            self.size += pad
+        return span
+
+    def strings(self, values: Iterable[bytes | None]) -> list[int]:
+        ends: array[int] = array("q")
+        blob = bytearray()
+        nulls = bytearray()
+        for row, value in enumerate(values):
+            if not row & 7:
+                nulls.append(0)
+            if value is None:
+                nulls[-1] |= 1 << (row & 7)
+            else:
+                blob += value
+            ends.append(len(blob))
+        return self.add(ends.tobytes()) + self.add(bytes(blob)) + self.add(bytes(nulls))
+
+    def column(self, kind: str, values: Sequence[Any]) -> dict[str, Any]:
+        if kind in {"q", "d"}:
+            return {"kind": kind, "span": self.add(array(kind, values).tobytes())}
+        if kind == "k":
+            refs: dict[Any, int] = {}
+            data = array("i", (refs.setdefault(v, len(refs)) for v in values))
+            return {"kind": kind, "span": self.add(data.tobytes()), "values": list(refs)}
+        return {"kind": kind, "span": self.strings(None if v is None else v.encode() for v in values)}
+
+    def table(self, model: type, records: Sequence[Any]) -> dict[str, Any]:
+        hints = typing.get_type_hints(model)
+        columns = {}
+        for field in dataclasses.fields(model):
+            values = [getattr(record, field.name) for record in records]
+            columns[field.name] = self.column(_kind(field.name, hints[field.name]), values)
+        return {"model": model.__name__, "rows": len(records), "columns": columns}
+
+
+class _Column:
+    __slots__ = ("blob", "ends", "kind", "nulls", "values", "view")
+
+    def __init__(self, snapshot: Snapshot, column: Mapping[str, Any]) -> None:
+        self.kind: str = column["kind"]
+        span = column["span"]
+        self.view: memoryview[Any] | None = None
+        self.values: list[Any] = []
+        if self.kind in {"q", "d"}:
+            self.view = snapshot.view(span[0], span[1], typing.cast("Literal['q', 'd']", self.kind))
+        elif self.kind == "k":
+            self.view = snapshot.view(span[0], span[1], "i")
+            self.values = [sys.intern(v) if isinstance(v, str) else v for v in column["values"]]
+        else:
+            self.ends = snapshot.view(span[0], span[1], "q")
+            self.blob = snapshot.view(span[2], span[3], "B")
+            self.nulls = snapshot.view(span[4], span[5], "B")
+
+    def get(self, row: int) -> Any:  # noqa: ANN401
+        if self.kind in {"q", "d"}:
+            return typing.cast("memoryview[Any]", self.view)[row]
+        if self.kind == "k":
+            return self.values[typing.cast("memoryview[int]", self.view)[row]]
+        if self.nulls[row >> 3] >> (row & 7) & 1:
+            return None
+        return bytes(self.blob[self.ends[row - 1] if row else 0 : self.ends[row]]).decode()
+
+    def load(self) -> list[Any]:
+        if self.kind in {"q", "d"}:
+            return typing.cast("memoryview[Any]", self.view).tolist()
+        if self.kind == "k":
+            values = self.values
+            return [values[ref] for ref in typing.cast("memoryview[int]", self.view)]
+        blob, nulls = bytes(self.blob), bytes(self.nulls)
+        ends = self.ends.tolist()
+        strings: list[str | None] = [blob[start:end].decode() for start, end in zip([0, *ends], ends, strict=False)]
+        if any(nulls):
+            for row in range(len(strings)):
+                if nulls[row >> 3] >> (row & 7) & 1:
+                    strings[row] = None
+        return strings
+
+
+# Column-wise view of one stored table. Numeric columns are exposed as zero-copy memoryviews over the mapping;
+# records are only materialized when indexed, or column by column in bulk when iterated.
+class SnapshotTable:
+    def __init__(self, snapshot: Snapshot, model: type, section: Mapping[str, Any]) -> None:
+        self.model = model
+        self.rows: int = section["rows"]
+        self._names = [field.name for field in dataclasses.fields(model)]
+        self._columns = [_Column(snapshot, section["columns"][name]) for name in self._names]
+        self._index: dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> Any:  # noqa: ANN401
+        if not -self.rows <= row < self.rows:
+            msg = f"row {row} out of range"
+            raise IndexError(msg)
+        row %= self.rows
+        return self.model(*(column.get(row) for column in self._columns))
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.model, *(column.load() for column in self._columns))
+
+    # Numeric columns come back as memoryviews over the mapping, without copying; others are decoded into a list.
+    def column(self, name: str) -> Sequence[Any]:
+        if name not in self._names:
+            msg = f"{self.model.__name__} has no column {name!r}"
+            raise KeyError(msg)
+        column = self._columns[self._names.index(name)]
+        return column.view if column.kind in {"q", "d"} and column.view is not None else column.load()
+
+    # The stream_id / series_id of every row (the first column of every stream model).
+    def keys(self) -> Sequence[int]:
+        return self.column(self._names[0])
+
+    # Lookup by stream_id / series_id; the key index is built from the first column on first use.
+    def get(self, key: int) -> Any | None:  # noqa: ANN401
+        if self._index is None:
+            self._index = {key: row for row, key in enumerate(self.keys())}
+        row = self._index.get(key)
+        return self[row] if row is not None else None
+
+
+# Read-only, memory-mapped snapshot file.
+class Snapshot:
+    def __init__(self, path: str | Path, decoder: JsonDecoder | str = "json") -> None:
+        self.path = Path(path)
+        self.decoder = get_decoder(decoder) if isinstance(decoder, str) else decoder
+        with self.path.open("rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: list[memoryview[Any]] = []
+        try:
+            toc, toc_size = self._read_toc()
+        except (ValueError, struct.error):
+            self._mmap.close()
+            raise
+        self.created_at: float = toc["created_at"]
+        self._sections: dict[str, dict[str, Any]] = toc["sections"]
+        self._data = HEADER.size + toc_size + _align(HEADER.size + toc_size)
+        self._tables: dict[str, SnapshotTable] = {}
+        self._info_index: dict[str, tuple[dict[int, int], Callable[[int], bytes]]] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    # Tables and columns handed out by this snapshot are unusable once it is closed; records are not.
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._tables.clear()
+        self._info_index.clear()
+        self._mmap.close()
+
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        catalogs: Iterable[Catalog],
+        info: Mapping[str, Mapping[int, Any]] | None = None,
+    ) -> None:
+        builder = _Builder()
+        sections: dict[str, Any] = {}
+        for catalog in catalogs:
+            model = XTream.stream_model(catalog.stream_type)
+            sections[f"{catalog.stream_type}/categories"] = builder.table(Category, list(catalog.categories.values()))
+            sections[f"{catalog.stream_type}/streams"] = builder.table(model, list(catalog))
+        for stream_type, payloads in (info or {}).items():
+            keys = list(payloads)
+            blobs = (p if isinstance(p, bytes) else json.dumps(p).encode() for p in payloads.values())
+            sections[f"{stream_type}/info"] = {
+                "rows": len(keys),
+                "keys": builder.add(array("q", keys).tobytes()),
+                "payloads": builder.strings(blobs),
+            }
+        toc = json.dumps({"created_at": time.time(), "byteorder": sys.byteorder, "sections": sections}).encode()
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        try:
+            with tmp.open("wb") as fp:
+                fp.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(toc)))
+                fp.write(toc)
+                fp.write(b"\x00" * _align(HEADER.size + len(toc)))
+                fp.writelines(builder.chunks)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        tmp.replace(target)
+
+    def stream_types(self) -> list[str]:
+        return [name.rsplit("/", 1)[0] for name in self._sections if name.endswith("/streams")]
+
+    def streams(self, stream_type: str) -> SnapshotTable:
+        return self._table(f"{stream_type}/streams", XTream.stream_model(stream_type))
+
+    def categories(self, stream_type: str) -> SnapshotTable:
+        return self._table(f"{stream_type}/categories", Category)
+
+    def info_keys(self, stream_type: str) -> list[int]:
+        return list(self._info(stream_type)[0])
+
+    def info_raw(self, stream_type: str, key: int) -> bytes | None:
+        index, read = self._info(stream_type)
+        row = index.get(key)
+        return read(row) if row is not None else None
+
+    def info(self, stream_type: str, key: int) -> Any | None:  # noqa: ANN401
+        raw = self.info_raw(stream_type, key)
+        return self.decoder.loads(raw) if raw is not None else None
+
+    def view(self, offset: int, size: int, fmt: Literal["q", "d", "i", "B"]) -> memoryview[Any]:
+        start = self._data + offset
+        view = memoryview(self._mmap)[start : start + size].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def bytes_reader(self, span: Sequence[int]) -> Callable[[int], bytes]:
+        ends = self.view(span[0], span[1], "q")
+        blob = self.view(span[2], span[3], "B")
+        return lambda row: bytes(blob[ends[row - 1] if row else 0 : ends[row]])
+
+    def _read_toc(self) -> tuple[dict[str, Any], int]:
+        magic, version, toc_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            msg = f"{self.path} is not an xtream snapshot"
+            raise ValueError(msg)
+        if version != SNAPSHOT_VERSION:
+            msg = f"{self.path} has unsupported snapshot version {version}"
+            raise ValueError(msg)
+        toc = json.loads(self._mmap[HEADER.size : HEADER.size + toc_size])
+        if toc["byteorder"] != sys.byteorder:
+            msg = f"{self.path} was written on a {toc['byteorder']}-endian machine"
+            raise ValueError(msg)
+        return toc, toc_size
+
+    def _table(self, name: str, model: type) -> SnapshotTable:
+        table = self._tables.get(name)
+        if table is None:
+            section = self._sections.get(name)
+            if section is None:
+                msg = f"{self.path} has no {name} table"
+                raise KeyError(msg)
+            if section["model"] != model.__name__:
+                msg = f"{self.path}: {name} holds {section['model']}, expected {model.__name__}"
+                raise ValueError(msg)
+            table = self._tables[name] = SnapshotTable(self, model, section)
+        return table
+
+    def _info(self, stream_type: str) -> tuple[dict[int, int], Callable[[int], bytes]]:
+        info = self._info_index.get(stream_type)
+        if info is None:
+            section = self._sections.get(f"{stream_type}/info")
+            if section is None:
+                info = ({}, bytes)
+            else:
+                keys = self.view(section["keys"][0], section["keys"][1], "q")
+                info = ({key: row for row, key in enumerate(keys)}, self.bytes_reader(section["payloads"]))
+            self._info_index[stream_type] = info
+        return info
+
+
+# Keeps the catalogs of one account available across restarts: load() serves them from the snapshot at
+# `path` straight away, refresh() (or refresh_in_background()) downloads fresh listings, swaps them in and
+# rewrites the snapshot. Info payloads fetched through info() are written alongside by the next refresh() or
+# save(), and carried over by refreshes for every title whose fingerprint did not change.
+class CatalogStore:
+    def __init__(
+        self,
+        client: XTream,
+        path: str | Path,
+        stream_types: Sequence[str] = (XTream.live_type, XTream.vod_type, XTream.series_type),
+    ) -> None:
+        self.client = client
+        self.path = Path(path)
+        self.stream_types = tuple(stream_types)
+        self.catalogs: dict[str, Catalog] = {}
+        self._snapshot: Snapshot | None = None
+        self._info: dict[str, dict[int, bytes]] = {}
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xtream-store")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: object,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
+
+    # Serves whatever the snapshot holds right away and refreshes from the network in the background.
+    def start(self) -> Future[None]:
+        self.load()
+        return self.refresh_in_background()
+
+    # Returns False (and keeps the current catalogs) when there is no usable snapshot.
+    def load(self) -> bool:
+        try:
+            snapshot = Snapshot(self.path, self.client.decoder)
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            logger.warning("Ignoring snapshot: %s", e)
+            return False
+        available = snapshot.stream_types()
+        catalogs = {t: Catalog.from_snapshot(snapshot, t) for t in self.stream_types if t in available}
+        with self._lock:
+            if self._snapshot is not None:
+                # Catalogs the new snapshot does not replace still read from the old one.
+                for stream_type, catalog in self.catalogs.items():
+                    if stream_type not in catalogs:
+                        catalog.materialize()
+                self._snapshot.close()
+            self._snapshot = snapshot
+            self.catalogs.update(catalogs)
+        logger.debug("Loaded %s from %s", ", ".join(f"{len(c)} {t}" for t, c in catalogs.items()), self.path)
+        return True
+
+    def refresh(self) -> None:
+        fresh = {stream_type: Catalog.fetch(self.client, stream_type) for stream_type in self.stream_types}
+        with self._lock:
+            self._write(fresh)
+
+    # Writes the current catalogs, with every info payload fetched so far, to the snapshot.
+    def save(self) -> None:
+        with self._lock:
+            self._write(self.catalogs)
+
+    def refresh_in_background(self) -> Future[None]:
+        return self._executor.submit(self.refresh)
+
+    def catalog(self, stream_type: str) -> Catalog:
+        with self._lock:
+            return self.catalogs[stream_type]
+
+    # get_vod_info / get_series_info for `key`, from the snapshot when present, fetched (and kept) otherwise.
+    def info(self, stream_type: str, key: int) -> Any | None:  # noqa: ANN401
+        raw = self._raw_info(stream_type, key)
+        if raw is None:
+            fetch = self.client.info_fetcher(stream_type)
+            if fetch is None:
+                return None
+            raw = fetch(str(key)).content
+            with self._lock:
+                self._info.setdefault(stream_type, {})[key] = raw
+        return self.client.decoder.loads(raw)
+
+    def _raw_info(self, stream_type: str, key: int) -> bytes | None:
+        with self._lock:
+            raw = self._info.get(stream_type, {}).get(key)
+            if raw is None and self._snapshot is not None:
+                raw = self._snapshot.info_raw(stream_type, key)
+            return raw
+
+    # The new file is written next to the old one and swapped in; the old snapshot (which `catalogs` may still be
+    # reading from) is only closed once the new one is open, so a failed write leaves the store as it was.
+    def _write(self, catalogs: dict[str, Catalog]) -> None:
+        info = {stream_type: self._carried_info(stream_type, catalog) for stream_type, catalog in catalogs.items()}
+        Snapshot.write(self.path, catalogs.values(), info)
+        snapshot = Snapshot(self.path, self.client.decoder)
+        previous, self._snapshot = self._snapshot, snapshot
+        self.catalogs = {stream_type: Catalog.from_snapshot(snapshot, stream_type) for stream_type in catalogs}
+        self._info = {}
+        if previous is not None:
+            previous.close()
+
+    def _carried_info(self, stream_type: str, fresh: Catalog) -> dict[int, bytes]:
+        previous = self.catalogs.get(stream_type)
+        if previous is None:
+            return {}
+        keys = set(self._info.get(stream_type, {}))
+        if self._snapshot is not None:
+            keys.update(self._snapshot.info_keys(stream_type))
+        carried: dict[int, bytes] = {}
+        for key in keys:
+            old, new = previous.get(key), fresh.get(key)
+            if old is None or new is None or fingerprint(old) != fingerprint(new):
+                continue
+            raw = self._raw_info(stream_type, key)
+            if raw is not None:
+                carried[key] = raw
+        return carried
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+import requests
+
+from xtream._models import Series
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from xtream._models import StreamRecord
+    from xtream._xtream import XTream
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION: Final[int] = 1
+# Marks a detail fetch that failed; None is a valid decoded payload.
+_FAILED: Final = object()
+
+
+@dataclass(slots=True)
+class ChangeSet:
+    stream_type: str
+    added: list[StreamRecord] = field(default_factory=list)
+    updated: list[StreamRecord] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    # get_vod_info / get_series_info payloads for every added or updated title, keyed by record key.
+    details: dict[int, Any] = field(default_factory=dict)
+    # Added or updated titles whose detail could not be fetched; they are reported again by the next sync.
+    failed: list[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+# The stamp that changes when a title changes: series carry last_modified, live and VOD streams only `added`.
+def fingerprint(record: StreamRecord) -> int:
+    return record.last_modified if isinstance(record, Series) else record.added
+
+
+# Remembers, per stream type, the key -> fingerprint map of the last listing that was synced. Each run diffs the
+# current listing against it and only fetches per-title detail for what was added or changed.
+class CatalogSync:
+    DEFAULT_WORKERS: Final[int] = 8
+
+    def __init__(self, client: XTream, state_dir: str | Path, workers: int = DEFAULT_WORKERS) -> None:
+        self.client = client
+        self.state_dir = Path(state_dir)
+        self.workers = workers
+
+    def sync(self, stream_type: str, fetch_details: bool = True) -> ChangeSet:
+        previous = self.load_snapshot(stream_type)
+        current: dict[int, int] = {}
+        changes = ChangeSet(stream_type)
+        for record in self.client.iter_stream_records(stream_type):
+            stamp = fingerprint(record)
+            current[record.key] = stamp
+            old = previous.get(record.key)
+            if old is None:
+                changes.added.append(record)
+            elif old != stamp:
+                changes.updated.append(record)
+        changes.removed = [key for key in previous if key not in current]
+
+        if fetch_details:
+            changes.details, changes.failed = self._fetch_details(stream_type, [*changes.added, *changes.updated])
+            # Failed titles keep their previous stamp (or stay unknown), so the next sync picks them up again.
+            for key in changes.failed:
+                if key in previous:
+                    current[key] = previous[key]
+                else:
+                    del current[key]
+        # Only persist once the whole run succeeded, so an interrupted sync is simply retried next time.
+        self.save_snapshot(stream_type, current)
+        logger.debug(
+            "%s sync: %d added, %d updated, %d removed, %d failed",
+            stream_type,
+            len(changes.added),
+            len(changes.updated),
+            len(changes.removed),
+            len(changes.failed),
+        )
+        return changes
+
+    def load_snapshot(self, stream_type: str) -> dict[int, int]:
+        path = self._snapshot_path(stream_type)
+        if not path.exists():
+            return {}
+        with path.open() as fp:
+            data = json.load(fp)
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.warning("Ignoring %s: unsupported snapshot version %r", path, data.get("version"))
+            return {}
+        return {int(key): stamp for key, stamp in data["entries"].items()}
+
+    def save_snapshot(self, stream_type: str, entries: dict[int, int]) -> None:
+        path = self._snapshot_path(stream_type)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w") as fp:
+            json.dump({"version": SNAPSHOT_VERSION, "stream_type": stream_type, "entries": entries}, fp)
+        tmp.replace(path)
+
+    def _snapshot_path(self, stream_type: str) -> Path:
+        return self.state_dir / f"{stream_type.lower()}-snapshot.json"
+
+    # Details by key, and the keys whose request or decoding failed.
+    def _fetch_details(self, stream_type: str, records: list[StreamRecord]) -> tuple[dict[int, Any], list[int]]:
+        fetch = self.client.info_fetcher(stream_type)
+        if fetch is None or not records:
+            return {}, []
+        keys = [record.key for record in records]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="xtream-sync") as executor:
+            payloads = dict(zip(keys, executor.map(lambda key: self._fetch_detail(fetch, stream_type, key), keys), strict=True))
+        return {key: payload for key, payload in payloads.items() if payload is not _FAILED}, [k for k, p in payloads.items() if p is _FAILED]
+
+    def _fetch_detail(self, fetch: Callable[[str], requests.Response], stream_type: str, key: int) -> Any:  # noqa: ANN401
+        try:
+            return self.client.decode(fetch(str(key)))
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("%s detail for %s failed: %s", stream_type, key, e)
+            return _FAILED
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final, cast
+from xml.etree.ElementTree import XMLPullParser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from xml.etree.ElementTree import Element
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC: Final[bytes] = b"\x1f\x8b"
+
+
+@dataclass(frozen=True, slots=True)
+class Channel:
+    id: str
+    display_names: tuple[str, ...]
+    icon: str | None = None
+    url: str | None = None
+
+    @property
+    def display_name(self) -> str:
+        return self.display_names[0] if self.display_names else self.id
+
+
+@dataclass(frozen=True, slots=True)
+class Programme:
+    channel: str
+    start: dt.datetime | None
+    stop: dt.datetime | None
+    title: str
+    sub_title: str | None = None
+    desc: str | None = None
+    categories: tuple[str, ...] = ()
+    icon: str | None = None
+
+
+XMLTVRecord = Channel | Programme
+
+
+# Parses the XMLTV guide incrementally: `chunks` is consumed one piece at a time, gzip is inflated on the fly
+# (when the payload itself is gzipped, rather than the transfer), and every <channel>/<programme> is yielded
+# as soon as its closing tag arrives. Finished elements are dropped from the tree, so memory stays bounded
+# by the largest single record and the chunk size rather than the size of the guide.
+def iter_xmltv(chunks: Iterable[bytes]) -> Iterator[XMLTVRecord]:
+    parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+    root: Element | None = None
+    depth = 0
+    for chunk in _inflate(chunks):
+        parser.feed(chunk)
+        # Only start/end events are requested, so every item is an (event, Element) pair.
+        for item in parser.read_events():
+            event, elem = cast("tuple[str, Element]", item)
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            # Only direct children of <tv> are records; everything deeper belongs to one of them.
+            if depth != 1 or root is None:
+                continue
+            record = _to_record(elem)
+            root.clear()
+            if record is not None:
+                yield record
+    parser.close()
+
+
+def _inflate(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    it = iter(chunks)
+    head = b""
+    for chunk in it:
+        head += chunk
+        if len(head) >= len(GZIP_MAGIC):
+            break
+    if not head.startswith(GZIP_MAGIC):
+        if head:
+            yield head
+        yield from it
+        return
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = head
+    while True:
+        data = decompressor.decompress(pending)
+        if data:
+            yield data
+        # Concatenated gzip members are legal; restart on whatever the previous member left over.
+        if decompressor.eof and decompressor.unused_data:
+            pending = decompressor.unused_data
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            continue
+        pending = next(it, b"")
+        if not pending:
+            break
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def _to_record(elem: Element) -> XMLTVRecord | None:
+    if elem.tag == "programme":
+        return Programme(
+            channel=elem.get("channel", ""),
+            start=parse_xmltv_time(elem.get("start")),
+            stop=parse_xmltv_time(elem.get("stop")),
+            title=elem.findtext("title") or "",
+            sub_title=elem.findtext("sub-title"),
+            desc=elem.findtext("desc"),
+            categories=tuple(c.text for c in elem.iterfind("category") if c.text),
+            icon=_icon(elem),
+        )
+    if elem.tag == "channel":
+        return Channel(
+            id=elem.get("id", ""),
+            display_names=tuple(d.text for d in elem.iterfind("display-name") if d.text),
+            icon=_icon(elem),
+            url=elem.findtext("url"),
+        )
+    return None
+
+
+def _icon(elem: Element) -> str | None:
+    icon = elem.find("icon")
+    return icon.get("src") if icon is not None else None
+
+
+# XMLTV timestamps are "YYYYmmddHHMMSS +hhmm"; the offset and the trailing fields are optional.
+def parse_xmltv_time(value: str | None) -> dt.datetime | None:
+    if not value:
+        return None
+    stamp, _, offset = value.strip().partition(" ")
+    stamp += "00000101000000"[len(stamp) :]
+    try:
+        tz = dt.UTC
+        if offset:
+            sign = -1 if offset[0] == "-" else 1
+            digits = offset.lstrip("+-")
+            tz = dt.timezone(sign * dt.timedelta(hours=int(digits[:2]), minutes=int(digits[2:4] or 0)))
+        return dt.datetime(
+            int(stamp[0:4]),
+            int(stamp[4:6]),
+            int(stamp[6:8]),
+            int(stamp[8:10]),
+            int(stamp[10:12]),
+            int(stamp[12:14]),
+            tzinfo=tz,
+        )
+    except ValueError:
+        logger.debug("Unparseable XMLTV time %r", value)
+        return None
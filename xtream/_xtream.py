@@ -1,33 +1,84 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from typing import TYPE_CHECKING, Any, Final, Self
-from urllib.parse import urljoin
+from typing import TYPE_CHECKING, Any, Final, Self, TypeVar, cast
+from urllib.parse import parse_qsl, urljoin, urlsplit
 
 import requests
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from urllib3.util import Retry
 
+from xtream._decode import get_decoder
+from xtream._json_stream import iter_json_array
+from xtream._limiter import RETRY_STATUSES
+from xtream._metrics import ChunkMeter, RequestMetrics
+from xtream._models import Category, EpgEntry, LiveStream, Series, VodStream
+from xtream._playlist import M3UWriter, StreamUrlBuilder, choose_live_extension
+from xtream._singleflight import SingleFlight
+from xtream._xmltv import iter_xmltv
+
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Future
     from types import TracebackType
 
+    from xtream._cache import ResponseCache
+    from xtream._decode import JsonDecoder
+    from xtream._limiter import AdaptiveLimiter
+    from xtream._metrics import MetricsSink
+    from xtream._models import StreamRecord
+    from xtream._playlist import Writable
+    from xtream._xmltv import XMLTVRecord
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_DONE: Final = object()
+
 
 class XTream:
     MAX_NUMBER_RETRIES: Final[int] = 3
+    RETRY_BACKOFF_FACTOR: Final[float] = 0.5
     DEFAULT_TIMEOUT: Final[tuple[float, float]] = (5, 30)
+    DEFAULT_POOL_SIZE: Final[int] = DEFAULT_POOLSIZE
+    EPG_CHUNK_SIZE: Final[int] = 1 << 16
+    STREAM_CHUNK_SIZE: Final[int] = 1 << 16
+    DEFAULT_PAGE_SIZE: Final[int] = 1000
+    DEFAULT_PREFETCH: Final[int] = 2
 
     live_type = "Live"
     vod_type = "VOD"
     series_type = "Series"
 
-    def __init__(self, server: str, username: str, password: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        server: str,
+        username: str,
+        password: str,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        cache: ResponseCache | None = None,
+        metrics: MetricsSink | None = None,
+        decoder: JsonDecoder | str = "json",
+        limiter: AdaptiveLimiter | None = None,
+    ) -> None:
         self.server = server
         self.username = username
         self.__password = password
+        self.pool_size = pool_size
+        self.cache = cache
+        self.metrics = metrics
+        self.decoder = get_decoder(decoder) if isinstance(decoder, str) else decoder
+        self.limiter = limiter
         self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+        self._inflight: SingleFlight[requests.Response] = SingleFlight()
         self.url = urljoin(self.server, "player_api.php")
 
     def __enter__(self) -> Self:
@@ -39,8 +90,13 @@ class XTream:
         exc_val: object,
         exc_tb: TracebackType | None,
     ) -> None:
-        if self._session is not None:
-            self._session.close()
+        self.close()
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
 
     # Note: The API Does not provide Full links to the requested stream. You have to build the url to the stream in order to play it.
     #
@@ -63,27 +119,31 @@ class XTream:
 
     # GET Stream Categories
     def categories(self, stream_type: str) -> requests.Response:
-        params: dict[str, Any] = {}
-        if stream_type == self.live_type:
-            params = self._get_live_categories_params()
-        elif stream_type == self.vod_type:
-            params = self._get_vod_cat_params()
-        elif stream_type == self.series_type:
-            params = self._get_series_cat_params()
-
-        return self._make_request(self.url, params=params)
+        return self._make_request(self.url, params=self._get_categories_params(stream_type))
 
     # GET Streams
     def streams(self, stream_type: str) -> requests.Response:
-        params: dict[str, Any] = {}
-        if stream_type == self.live_type:
-            params = self._get_live_streams_params()
-        elif stream_type == self.vod_type:
-            params = self._get_vod_streams_params()
-        elif stream_type == self.series_type:
-            params = self._get_series_params()
+        return self._make_request(self.url, params=self._get_streams_params(stream_type))
+
+    # Streaming variant of streams: array elements are decoded one at a time while the listing downloads.
+    def iter_streams(self, stream_type: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+        return self._iter_streamed(self.url, self._get_streams_params(stream_type), chunk_size, iter_json_array)
+
+    # Typed variants: every element is converted to its record model as soon as it is decoded.
+    def iter_stream_records(self, stream_type: str) -> Iterator[StreamRecord]:
+        model = self.stream_model(stream_type)
+        for data in self.iter_streams(stream_type):
+            yield model.from_dict(data)
 
-        return self._make_request(self.url, params=params)
+    # Whole-listing variant of iter_stream_records: one download, one decoder pass over the raw bytes.
+    def stream_records(self, stream_type: str) -> list[StreamRecord]:
+        model = self.stream_model(stream_type)
+        params = self._get_streams_params(stream_type)
+        return [model.from_dict(data) for data in self._decode_json(params, self._make_request(self.url, params=params))]
+
+    def category_records(self, stream_type: str) -> list[Category]:
+        params = self._get_categories_params(stream_type)
+        return [Category.from_dict(data) for data in self._decode_json(params, self._make_request(self.url, params=params))]
 
     # GET Streams by Category
     def streams_by_category(
@@ -91,15 +151,26 @@ class XTream:
         stream_type: str,
         category_id: str,
     ) -> requests.Response:
-        params: dict[str, Any] = {}
-        if stream_type == self.live_type:
-            params = self._get_live_streams_by_category_params(category_id)
-        elif stream_type == self.vod_type:
-            params = self._get_vod_streams_by_category_params(category_id)
-        elif stream_type == self.series_type:
-            params = self._get_series_by_category_params(category_id)
+        return self._make_request(self.url, params=self._get_streams_by_category_params(stream_type, category_id))
+
+    # Paged variants: the listing is walked with offset/items_per_page, keeping up to `prefetch` further pages
+    # in flight while the current one is consumed.
+    def iter_streams_paged(
+        self,
+        stream_type: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[dict[str, Any]]:
+        return self._iter_pages(self._get_streams_params(stream_type), page_size, prefetch)
 
-        return self._make_request(self.url, params=params)
+    def iter_streams_by_category_paged(
+        self,
+        stream_type: str,
+        category_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[dict[str, Any]]:
+        return self._iter_pages(self._get_streams_by_category_params(stream_type, category_id), page_size, prefetch)
 
     # GET SERIES Info
     def series_info_by_id(self, series_id: str) -> requests.Response:
@@ -119,6 +190,15 @@ class XTream:
             params=self._get_vod_info_by_id_params(vod_id),
         )
 
+    # vod_info_by_id or series_info_by_id, whichever fits `stream_type`; None for live streams, which have no info.
+    def info_fetcher(self, stream_type: str) -> Callable[[str], requests.Response] | None:
+        model = self.stream_model(stream_type)
+        if model is VodStream:
+            return self.vod_info_by_id
+        if model is Series:
+            return self.series_info_by_id
+        return None
+
     # GET short_epg for LIVE Streams (same as stalker portal, prints the next X EPG that will play soon)
     def live_epg_by_stream(self, stream_id: str) -> requests.Response:
         return self._make_request(
@@ -136,6 +216,14 @@ class XTream:
             params=self.get_live_epg_by_stream_and_limit_params(stream_id, limit),
         )
 
+    # Typed variant of live_epg_by_stream / live_epg_by_stream_and_limit. `cached=False` skips the response cache,
+    # for callers that decide themselves how long a listing stays valid.
+    def short_epg_records(self, stream_id: str, limit: int | None = None, cached: bool = True) -> list[EpgEntry]:
+        params = self._get_live_epg_by_stream_params(stream_id) if limit is None else self.get_live_epg_by_stream_and_limit_params(stream_id, limit)
+        data = self._decode_json(params, self._make_request(self.url, params=params, cached=cached))
+        listings = data.get("epg_listings") if isinstance(data, dict) else data
+        return [EpgEntry.from_dict(entry) for entry in listings or ()]
+
     #  GET ALL EPG for LIVE Streams (same as stalker portal, but it will print all epg listings regardless of the day)
     def all_live_epg_by_stream(self, stream_id: str) -> requests.Response:
         return self._make_request(
@@ -147,6 +235,40 @@ class XTream:
     def all_epg(self) -> requests.Response:
         return self._make_request(self._get_all_epg_url())
 
+    # Streaming variant of all_epg: the guide is parsed while it downloads and yielded as Channel/Programme records.
+    def iter_epg(self, chunk_size: int = EPG_CHUNK_SIZE) -> Iterator[XMLTVRecord]:
+        return self._iter_streamed(self._get_all_epg_url(), None, chunk_size, iter_xmltv)
+
+    # Playable stream URLs for this account. Without `live_extension` the live container is picked from the
+    # account's allowed_output_formats, which costs one authenticate() round-trip.
+    def url_builder(self, live_extension: str | None = None) -> StreamUrlBuilder:
+        if live_extension is None:
+            user_info = self.decode(self.authenticate()).get("user_info") or {}
+            live_extension = choose_live_extension(user_info.get("allowed_output_formats") or ())
+        return StreamUrlBuilder(self.server, self.username, self.__password, live_extension)
+
+    # Streams the listings of `stream_types` straight into an M3U playlist on `out` (a binary file or socket),
+    # one category lookup per type and no intermediate list. Returns the number of entries written.
+    def write_m3u(
+        self,
+        out: Writable,
+        stream_types: Iterable[str] = (live_type, vod_type),
+        live_extension: str | None = None,
+    ) -> int:
+        urls = self.url_builder(live_extension)
+        with M3UWriter(out, urls, epg_url=urls.epg_url) as writer:
+            for stream_type in stream_types:
+                writer.categories = {c.category_id: c.category_name for c in self.category_records(stream_type)}
+                writer.write_all(self.iter_stream_records(stream_type))
+        return writer.count
+
+    # Decodes a response returned by this client from its raw bytes with the configured decoder, skipping the
+    # charset detection that Response.json() runs when the panel does not declare one.
+    def decode(self, response: requests.Response) -> Any:  # noqa: ANN401
+        request_url = response.request.url if response.request is not None else None
+        params = dict(parse_qsl(urlsplit(request_url).query)) if request_url else None
+        return self._decode_json(params, response)
+
     ## URL-builder methods
     def __get_authentication_params(
         self,
@@ -157,15 +279,234 @@ class XTream:
         self,
         url: str,
         params: dict[str, Any] | None = None,
+        stream: bool = False,
+        cached: bool = True,
     ) -> requests.Response:
+        if stream:
+            # A streamed body can only be consumed once, so it is never shared between callers.
+            return self._fetch(url, params, stream=True, cached=cached)
+        # Identical requests issued concurrently from several threads share a single round-trip.
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())) if params else (), cached)
+        return self._inflight.do(key, lambda: self._fetch(url, params, cached=cached))
+
+    def _fetch(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        stream: bool = False,
+        cached: bool = True,
+    ) -> requests.Response:
+        if self.cache is None or not cached:
+            return self._send(url, params, stream=stream)
+        return self._make_cached_request(self.cache, url, params, stream=stream)
+
+    # Fresh entries are answered locally; stale ones are revalidated with ETag/Last-Modified when the panel sent them.
+    # Streamed bodies are served from the cache when possible but never buffered into it.
+    def _make_cached_request(
+        self,
+        cache: ResponseCache,
+        url: str,
+        params: dict[str, Any] | None,
+        stream: bool = False,
+    ) -> requests.Response:
+        ttl = cache.ttl(params)
+        if ttl <= 0:
+            return self._send(url, params, stream=stream)
+        key = cache.key(url, params, self.username)
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh():
+            logger.debug("Cache hit %s, params=%s", url, params if params else "")
+            if self.metrics is not None:
+                self.metrics.record_request(RequestMetrics(self._get_action_name(url, params), entry.status_code, 0.0, 0.0, entry.size, cached=True))
+            return entry.to_response()
+        headers = cache.conditional_headers(entry) if entry is not None else None
+        r = self._send(url, params, stream=stream, headers=headers)
+        if entry is not None and r.status_code == HTTPStatus.NOT_MODIFIED:
+            r.close()
+            return cache.refresh(key, entry, ttl).to_response()
+        if not stream:
+            cache.store(key, r, ttl)
+        return r
+
+    def _send(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        stream: bool = False,
+        headers: dict[str, str] | None = None,
+    ) -> requests.Response:
+        action = self._get_action_name(url, params)
         auth_params = self.__get_authentication_params()
         logger.debug("Sending %s, params=%s", url, params if params else "")
         params = {**auth_params, **params} if params else auth_params
-        r = self._ensure_session().get(url, params=params, timeout=self.DEFAULT_TIMEOUT)
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            r = self._get(url, params, stream, headers)
+            while self.limiter is not None and (delay := self.limiter.retry_delay(r, attempt)) is not None:
+                logger.debug("%s, retrying in %.2fs", self._get_status(r), delay)
+                r.close()
+                time.sleep(delay)
+                attempt += 1
+                r = self._get(url, params, stream, headers)
+        except requests.RequestException as e:
+            if self.metrics is not None:
+                self.metrics.record_request(RequestMetrics(action, 0, 0.0, time.perf_counter() - started, 0, error=type(e).__name__))
+            raise
         logger.debug("%s", self._get_status(r))
+        # Streamed bodies are measured by _iter_streamed once they have been fully read.
+        if self.metrics is not None and not (stream and r.ok):
+            self.metrics.record_request(
+                RequestMetrics(
+                    action,
+                    r.status_code,
+                    r.elapsed.total_seconds(),
+                    time.perf_counter() - started,
+                    len(r.content),
+                    self._get_retries(r) + attempt,
+                    error=None if r.ok else self._get_status(r),
+                )
+            )
         r.raise_for_status()
         return r
 
+    # A single attempt, admitted through the limiter when there is one. For streamed bodies the limiter slot is
+    # released once the headers are in; the limiter paces requests, the connection pool bounds open bodies.
+    def _get(
+        self,
+        url: str,
+        params: dict[str, Any],
+        stream: bool,
+        headers: dict[str, str] | None,
+    ) -> requests.Response:
+        session = self._ensure_session()
+        if self.limiter is None:
+            return session.get(url, params=params, headers=headers, timeout=self.DEFAULT_TIMEOUT, stream=stream)
+        with self.limiter.slot(urlsplit(url).netloc) as slot:
+            r = session.get(url, params=params, headers=headers, timeout=self.DEFAULT_TIMEOUT, stream=stream)
+            slot.observe(r)
+        return r
+
+    # Streams a body through `decode`, reporting total latency, size and the time spent inside the decoder
+    # (excluding network waits and whatever the consumer does between items).
+    def _iter_streamed(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        chunk_size: int,
+        decode: Callable[[Iterable[bytes]], Iterator[T]],
+    ) -> Iterator[T]:
+        started = time.perf_counter()
+        with self._make_request(url, params=params, stream=True) as r:
+            meter = ChunkMeter(r.iter_content(chunk_size=chunk_size))
+            it = decode(meter)
+            busy = 0.0
+            while True:
+                t = time.perf_counter()
+                item = next(it, _DONE)
+                busy += time.perf_counter() - t
+                if item is _DONE:
+                    break
+                yield cast("T", item)
+            if self.metrics is not None:
+                action = self._get_action_name(url, params)
+                latency = time.perf_counter() - started
+                self.metrics.record_request(
+                    RequestMetrics(action, r.status_code, r.elapsed.total_seconds(), latency, meter.size, self._get_retries(r))
+                )
+                self.metrics.record_decode(action, max(busy - meter.network, 0.0))
+
+    def _decode_json(self, params: dict[str, Any] | None, response: requests.Response) -> Any:  # noqa: ANN401
+        if self.metrics is None:
+            return self.decoder.loads(response.content)
+        started = time.perf_counter()
+        data = self.decoder.loads(response.content)
+        self.metrics.record_decode(self._get_action_name(self.url, params), time.perf_counter() - started)
+        return data
+
+    @staticmethod
+    def _get_action_name(url: str, params: dict[str, Any] | None) -> str:
+        action = params.get("action") if params else None
+        return str(action) if action is not None else urlsplit(url).path.rsplit("/", 1)[-1]
+
+    @staticmethod
+    def _get_retries(response: requests.Response) -> int:
+        retries = getattr(response.raw, "retries", None)
+        return len(retries.history) if retries is not None else 0
+
+    def _get_categories_params(self, stream_type: str) -> dict[str, Any]:
+        if stream_type == self.live_type:
+            return self._get_live_categories_params()
+        if stream_type == self.vod_type:
+            return self._get_vod_cat_params()
+        if stream_type == self.series_type:
+            return self._get_series_cat_params()
+        return {}
+
+    def _get_streams_params(self, stream_type: str) -> dict[str, Any]:
+        if stream_type == self.live_type:
+            return self._get_live_streams_params()
+        if stream_type == self.vod_type:
+            return self._get_vod_streams_params()
+        if stream_type == self.series_type:
+            return self._get_series_params()
+        return {}
+
+    def _get_streams_by_category_params(self, stream_type: str, category_id: str) -> dict[str, Any]:
+        if stream_type == self.live_type:
+            return self._get_live_streams_by_category_params(category_id)
+        if stream_type == self.vod_type:
+            return self._get_vod_streams_by_category_params(category_id)
+        if stream_type == self.series_type:
+            return self._get_series_by_category_params(category_id)
+        return {}
+
+    def _get_page_params(self, params: dict[str, Any], offset: int, page_size: int) -> dict[str, Any]:
+        return {**params, "offset": offset, "items_per_page": page_size}
+
+    def _iter_pages(self, params: dict[str, Any], page_size: int, prefetch: int) -> Iterator[dict[str, Any]]:
+        if page_size < 1:
+            msg = f"page_size must be >= 1, got {page_size}"
+            raise ValueError(msg)
+        # One page at a time until two full, different pages show that the panel honours offset/items_per_page;
+        # one that ignores them answers every request with the whole listing, which must not be prefetched.
+        window = 1
+        next_offset = 0
+        pending: deque[Future[requests.Response]] = deque()
+        previous_first: Any = None
+        with ThreadPoolExecutor(max_workers=max(prefetch, 0) + 1, thread_name_prefix="xtream-pages") as executor:
+            try:
+                while True:
+                    while len(pending) < window:
+                        pending.append(executor.submit(self._make_request, self.url, self._get_page_params(params, next_offset, page_size)))
+                        next_offset += page_size
+                    page = self._decode_json(params, pending.popleft().result())
+                    if not isinstance(page, list) or not page:
+                        return
+                    # Panels that ignore pagination answer every page with the full listing (or the same page).
+                    if page[0] == previous_first:
+                        return
+                    yield from page
+                    if len(page) != page_size:
+                        return
+                    if previous_first is not None:
+                        window = max(prefetch, 0) + 1
+                    previous_first = page[0]
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @classmethod
+    def stream_model(cls, stream_type: str) -> type[StreamRecord]:
+        if stream_type == cls.live_type:
+            return LiveStream
+        if stream_type == cls.vod_type:
+            return VodStream
+        if stream_type == cls.series_type:
+            return Series
+        msg = f"Unknown stream type {stream_type!r}"
+        raise ValueError(msg)
+
     def _get_all_epg_url(
         self,
     ) -> str:
@@ -246,14 +587,30 @@ class XTream:
         }
 
     def _ensure_session(self) -> requests.Session:
-        if self._session is None:
-            self._session = self._create_session()
-        return self._session
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session(self.pool_size, retry_status=self.limiter is None)
+                session = self._session
+        return session
 
     @classmethod
-    def _create_session(cls) -> requests.Session:
+    def _create_session(cls, pool_size: int = DEFAULT_POOL_SIZE, retry_status: bool = True) -> requests.Session:
         session = requests.Session()
-        adapter = HTTPAdapter(max_retries=Retry(total=cls.MAX_NUMBER_RETRIES))
+        # Connection failures are retried with jittered exponential backoff. Throttling statuses (429/503) are
+        # retried here too, honouring Retry-After, unless a limiter is configured: it retries them itself so
+        # that every throttle signal reaches its concurrency window.
+        retry = Retry(
+            total=cls.MAX_NUMBER_RETRIES,
+            backoff_factor=cls.RETRY_BACKOFF_FACTOR,
+            backoff_jitter=cls.RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES if retry_status else None,
+            respect_retry_after_header=retry_status,
+            raise_on_status=False,
+        )
+        # One pool per host, sized so that every concurrent caller can hold its own keep-alive connection.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session